@@ -1,54 +1,158 @@
 """Analytics module for trend calculations and business intelligence."""
+import inspect
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
-from zoneinfo import ZoneInfo
-
-from google.cloud import bigquery
+import threading
+import time
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
 
 from app.config import config
 
-logger = logging.getLogger(__name__)
-
-
-class AnalyticsClient:
-    """Analytics client for advanced BigQuery queries and trend analysis."""
-
-    def __init__(self):
-        self.client = bigquery.Client(project=config.BQ_PROJECT_ID)
-        self.table_id = config.get_full_table_id()
-        self.tz = ZoneInfo(config.TIMEZONE)
+if TYPE_CHECKING:
+    from google.cloud import bigquery
 
-    def get_now_pipeline(self, days: int = 7) -> List[Dict[str, Any]]:
-        """
-        Fetch top scoring qualified meetings, prioritizing highest scores.
-
-        Since all meetings have NOW=true in this dataset, we focus on highest scores.
-        """
-        end_date = datetime.now(self.tz)
-        # Set start_date to beginning of day to capture all meetings from that date
-        start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+logger = logging.getLogger(__name__)
 
-        query = f"""
+# Shared result cache: key -> (expires_at, Future holding the query result)
+_result_cache: Dict[Tuple, Tuple[float, Future]] = {}
+_result_cache_lock = threading.Lock()
+
+
+def ttl_cache(seconds: int = 300) -> Callable:
+    """
+    Memoize an AnalyticsClient method for the current time bucket.
+
+    Keys are (table, method, arguments, bucket) where bucket is the current time
+    floored to `seconds`. The first caller stores a Future so concurrent identical
+    requests wait on the same in-flight query. Exceptions are evicted rather than
+    memoized, so decorate a core that raises and apply fallback defaults outside
+    the cached call. Cached results are shared, so callers must treat them as read-only.
+    """
+    def decorator(func: Callable) -> Callable:
+        if seconds <= 0:
+            return func
+
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            call_args = tuple(v for k, v in bound.arguments.items() if k != "self")
+
+            now = time.time()
+            bucket = int(now // seconds)
+            key = (self.table_id, func.__name__, call_args, bucket)
+
+            with _result_cache_lock:
+                entry = _result_cache.get(key)
+                is_owner = entry is None
+                if is_owner:
+                    # Drop expired buckets while we hold the lock
+                    for stale in [k for k, (exp, f) in _result_cache.items() if exp <= now and f.done()]:
+                        del _result_cache[stale]
+                    future: Future = Future()
+                    _result_cache[key] = ((bucket + 1) * seconds, future)
+                else:
+                    future = entry[1]
+
+            if not is_owner:
+                logger.debug(f"Analytics cache hit: {func.__name__}{call_args}")
+                return future.result()
+
+            try:
+                result = func(self, *args, **kwargs)
+            except BaseException as e:
+                with _result_cache_lock:
+                    _result_cache.pop(key, None)
+                future.set_exception(e)
+                raise
+
+            future.set_result(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_cache() -> None:
+    """Clear all memoized analytics results (admin use)."""
+    with _result_cache_lock:
+        _result_cache.clear()
+    logger.info("Analytics result cache invalidated")
+
+
+# Hot JSON paths extracted into typed columns (STRING, and BOOL for the qualified
+# flags) so filters and GROUP BYs downstream work on typed values. Queries read
+# these from either the materialized flat table (see FLAT_TABLE_SQL) or, when
+# none is configured, an inline projection over the base table, so the section
+# SQL is the same for both.
+TYPED_COLUMNS_SQL = """
+            JSON_VALUE(client_info, '$.client') as client,
+            JSON_VALUE(fit, '$.services[0]') as primary_service,
+            JSON_VALUE(now, '$.summary') as now_summary,
+            JSON_VALUE(blocker, '$.summary') as blocker_summary,
+            JSON_VALUE(now, '$.evidence') as now_evidence,
+            JSON_VALUE(next, '$.evidence') as next_evidence,
+            JSON_VALUE(measure, '$.evidence') as measure_evidence,
+            JSON_VALUE(blocker, '$.evidence') as blocker_evidence,
+            JSON_VALUE(fit, '$.evidence') as fit_evidence,
+            SAFE_CAST(JSON_VALUE(now, '$.qualified') AS BOOL) as now_qualified,
+            SAFE_CAST(JSON_VALUE(next, '$.qualified') AS BOOL) as next_qualified,
+            SAFE_CAST(JSON_VALUE(measure, '$.qualified') AS BOOL) as measure_qualified,
+            SAFE_CAST(JSON_VALUE(blocker, '$.qualified') AS BOOL) as blocker_qualified,
+            SAFE_CAST(JSON_VALUE(fit, '$.qualified') AS BOOL) as fit_qualified
+"""
+
+# Nightly rebuild of the flat table; large free-text columns are not needed here
+FLAT_TABLE_SQL = """
+        CREATE OR REPLACE TABLE `{flat_table}`
+        PARTITION BY date
+        -- Co-locate rows for the per-client and per-host aggregations
+        CLUSTER BY client, creator_email
+        AS
         SELECT
+            * EXCEPT (full_transcript, enhanced_notes, my_notes),
+{typed_columns}
+        FROM `{table}`
+"""
+
+# Section queries are templates over `{source}` (the typed base relation for
+# standalone calls, or the `filtered` CTE in the fused dashboard query).
+# `{select}` is SELECT, or SELECT AS STRUCT when the section is packed into an
+# ARRAY column. `{partition}` is the table's DATE partition column, compared
+# against DATE parameters directly so BigQuery can prune partitions.
+NOW_PIPELINE_SQL = """
+        WITH top_meetings AS (
+            SELECT *
+            FROM {source}
+            WHERE {partition} BETWEEN @start_date AND @end_date
+                AND qualified = TRUE
+            ORDER BY total_qualified_sections DESC, date DESC
+            LIMIT 30
+        )
+        {select}
             meeting_id,
             FORMAT_DATE('%d %b %Y', date) as meeting_date,
-            IFNULL(JSON_VALUE(client_info, '$.client'), 'Unknown Client') as client,
+            IFNULL(client, 'Unknown Client') as client,
             creator_name as owner,
             creator_email,
             total_qualified_sections as score,
-            JSON_VALUE(now, '$.summary') as urgency_signal,
-            JSON_VALUE(now, '$.evidence') as now_evidence,
-            JSON_VALUE(next, '$.evidence') as next_evidence,
-            JSON_VALUE(measure, '$.evidence') as measure_evidence,
-            JSON_VALUE(blocker, '$.evidence') as blocker_evidence,
-            JSON_VALUE(fit, '$.evidence') as fit_evidence,
+            now_summary as urgency_signal,
+            now_evidence,
+            next_evidence,
+            measure_evidence,
+            blocker_evidence,
+            fit_evidence,
             -- Qualification flags for coaching feedback
-            JSON_VALUE(now, '$.qualified') as now_qualified,
-            JSON_VALUE(next, '$.qualified') as next_qualified,
-            JSON_VALUE(measure, '$.qualified') as measure_qualified,
-            JSON_VALUE(blocker, '$.qualified') as blocker_qualified,
-            JSON_VALUE(fit, '$.qualified') as fit_qualified,
+            CAST(now_qualified AS STRING) as now_qualified,
+            CAST(next_qualified AS STRING) as next_qualified,
+            CAST(measure_qualified AS STRING) as measure_qualified,
+            CAST(blocker_qualified AS STRING) as blocker_qualified,
+            CAST(fit_qualified AS STRING) as fit_qualified,
             IFNULL(title, calendar_event_title) as meeting_title,
             challenges,
             results,
@@ -57,48 +161,14 @@ class AnalyticsClient:
             desk,
             -- Meeting link if available
             IFNULL(granola_link, '') as meeting_link
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-            AND qualified = TRUE
+        FROM top_meetings
         ORDER BY total_qualified_sections DESC, date DESC
-        LIMIT 30
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
-        )
+"""
 
-        logger.info(f"Fetching NOW pipeline for last {days} days")
-
-        try:
-            query_job = self.client.query(query, job_config=job_config)
-            results = []
-            for row in query_job.result():
-                results.append(dict(row.items()))
-
-            logger.info(f"Found {len(results)} urgent opportunities")
-            return results
-        except Exception as e:
-            logger.error(f"NOW pipeline query failed: {e}", exc_info=True)
-            return []
-
-    def get_client_concentration(self, days: int = 7) -> Dict[str, Any]:
-        """
-        Analyze client engagement patterns.
-
-        Returns top clients, new vs returning ratio, and engagement depth.
-        """
-        end_date = datetime.now(self.tz)
-        # Set start_date to beginning of day to capture all meetings from that date
-        start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        query = f"""
+CLIENT_CONCENTRATION_SQL = """
         WITH client_stats AS (
             SELECT
-                JSON_VALUE(client_info, '$.client') as client,
+                client,
                 COUNT(*) as meeting_count,
                 AVG(total_qualified_sections) as avg_score,
                 COUNTIF(qualified = TRUE) as qualified_count,
@@ -113,12 +183,12 @@ class AnalyticsClient:
                     ORDER BY date DESC
                     LIMIT 1
                 )[OFFSET(0)] as latest_meeting
-            FROM `{self.table_id}`
-            WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-                AND JSON_VALUE(client_info, '$.client') IS NOT NULL
+            FROM {source}
+            WHERE {partition} BETWEEN @start_date AND @end_date
+                AND client IS NOT NULL
             GROUP BY client
         )
-        SELECT
+        {select}
             client,
             meeting_count,
             ROUND(avg_score, 1) as avg_score,
@@ -130,23 +200,595 @@ class AnalyticsClient:
         FROM client_stats
         ORDER BY meeting_count DESC, avg_score DESC
         LIMIT 10
+"""
+
+SERVICE_FIT_SQL = """
+        {select}
+            primary_service,
+            COUNT(*) as count,
+            AVG(total_qualified_sections) as avg_score
+        FROM {source}
+        WHERE {partition} BETWEEN @start_date AND @end_date
+            AND qualified = TRUE
+            AND fit_qualified
+        GROUP BY primary_service
+        ORDER BY count DESC
+"""
+
+DEAL_PIPELINE_SQL = """
+        WITH base AS (
+            SELECT
+                IFNULL(client, 'Unknown Client') as client,
+                IFNULL(title, calendar_event_title) as meeting_title,
+                FORMAT_DATE('%d %b %Y', date) as meeting_date,
+                creator_name as owner,
+                -- All evidence that might contain numbers
+                CONCAT(IFNULL(now_evidence, ''), ' ', IFNULL(measure_evidence, ''), ' ', IFNULL(blocker_evidence, '')) as all_evidence,
+                -- Granola link for full context
+                IFNULL(granola_link, '') as meeting_link,
+                scored_at
+            FROM {source}
+            WHERE {partition} BETWEEN @start_date AND @end_date
+                AND qualified = TRUE
+        )
+        {select}
+            client,
+            meeting_title,
+            meeting_date,
+            owner,
+            SUBSTR(all_evidence, 1, 500) as evidence_with_numbers,  -- Truncate for readability
+            meeting_link
+        FROM base
+        -- One scan for currency amounts or "k" figures across all evidence
+        WHERE REGEXP_CONTAINS(all_evidence, r'[£$][0-9]|\\d+[kK]')
+        ORDER BY scored_at DESC
+        LIMIT 30
+"""
+
+BLOCKER_PATTERNS_SQL = """
+        {select}
+            blocker_summary as blocker_type,
+            blocker_evidence as evidence,
+            COUNT(*) as frequency
+        FROM {source}
+        WHERE {partition} BETWEEN @start_date AND @end_date
+            AND blocker_qualified
+        GROUP BY blocker_type, evidence
+        ORDER BY frequency DESC
+        LIMIT 5
+"""
+
+HOST_PERFORMANCE_SQL = """
+        WITH hosts AS (
+            SELECT
+                creator_email,
+                creator_name,
+                COUNT(*) as total_meetings,
+                COUNTIF(qualified = TRUE) as qualified_meetings,
+                ROUND(AVG(total_qualified_sections), 1) as avg_score,
+
+                -- Discovery depth metrics
+                ROUND(100.0 * AVG(IF(now_qualified, 1, 0)), 1) as now_rate,
+                ROUND(100.0 * AVG(IF(next_qualified, 1, 0)), 1) as next_rate,
+                ROUND(100.0 * AVG(IF(measure_qualified, 1, 0)), 1) as measure_rate,
+                ROUND(100.0 * AVG(IF(blocker_qualified, 1, 0)), 1) as blocker_rate,
+                ROUND(100.0 * AVG(IF(fit_qualified, 1, 0)), 1) as fit_rate,
+
+                -- Quality score (average of discovery rates)
+                ROUND(100.0 * AVG(
+                    (IF(now_qualified, 1, 0) + IF(measure_qualified, 1, 0) + IF(blocker_qualified, 1, 0)) / 3.0
+                ), 1) as discovery_depth_score
+
+            FROM {source}
+            WHERE {partition} BETWEEN @start_date AND @end_date
+                AND creator_email IS NOT NULL
+            GROUP BY creator_email, creator_name
+            HAVING total_meetings >= 2  -- Only show hosts with multiple meetings
+        )
+        {select}
+            *,
+            -- Benchmark each host against the team average
+            ROUND(avg_score - AVG(avg_score) OVER (), 1) as vs_team_score,
+            ROUND(discovery_depth_score - AVG(discovery_depth_score) OVER (), 1) as vs_team_discovery
+        FROM hosts
+        ORDER BY avg_score DESC
+        LIMIT 200
+"""
+
+# Daily per-host rollup served to get_host_performance when BQ_HOST_DAILY_VIEW is
+# set. BigQuery maintains it incrementally, so the query reads days x hosts rows.
+HOST_DAILY_VIEW_SQL = """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS `{view}`
+        PARTITION BY date
+        CLUSTER BY creator_email
+        AS
+        SELECT
+            date,
+            creator_email,
+            creator_name,
+            COUNT(*) as meetings,
+            COUNTIF(qualified = TRUE) as qualified_meetings,
+            SUM(total_qualified_sections) as score_sum,
+            COUNTIF(SAFE_CAST(JSON_VALUE(now, '$.qualified') AS BOOL)) as now_qualified,
+            COUNTIF(SAFE_CAST(JSON_VALUE(next, '$.qualified') AS BOOL)) as next_qualified,
+            COUNTIF(SAFE_CAST(JSON_VALUE(measure, '$.qualified') AS BOOL)) as measure_qualified,
+            COUNTIF(SAFE_CAST(JSON_VALUE(blocker, '$.qualified') AS BOOL)) as blocker_qualified,
+            COUNTIF(SAFE_CAST(JSON_VALUE(fit, '$.qualified') AS BOOL)) as fit_qualified
+        FROM `{table}`
+        WHERE creator_email IS NOT NULL
+        GROUP BY date, creator_email, creator_name
+"""
+
+# Same output as HOST_PERFORMANCE_SQL, re-aggregated from the daily rollup
+HOST_PERFORMANCE_FROM_VIEW_SQL = """
+        WITH hosts AS (
+            SELECT
+                creator_email,
+                creator_name,
+                SUM(meetings) as total_meetings,
+                SUM(qualified_meetings) as qualified_meetings,
+                ROUND(SUM(score_sum) / SUM(meetings), 1) as avg_score,
+
+                -- Discovery depth metrics
+                ROUND(100.0 * SUM(now_qualified) / SUM(meetings), 1) as now_rate,
+                ROUND(100.0 * SUM(next_qualified) / SUM(meetings), 1) as next_rate,
+                ROUND(100.0 * SUM(measure_qualified) / SUM(meetings), 1) as measure_rate,
+                ROUND(100.0 * SUM(blocker_qualified) / SUM(meetings), 1) as blocker_rate,
+                ROUND(100.0 * SUM(fit_qualified) / SUM(meetings), 1) as fit_rate,
+
+                -- Quality score (average of discovery rates)
+                ROUND(
+                    100.0 * (SUM(now_qualified) + SUM(measure_qualified) + SUM(blocker_qualified))
+                    / (3 * SUM(meetings)), 1
+                ) as discovery_depth_score
+
+            FROM `{host_daily}`
+            WHERE date BETWEEN @start_date AND @end_date
+            GROUP BY creator_email, creator_name
+            HAVING total_meetings >= 2  -- Only show hosts with multiple meetings
+        )
+        {select}
+            *,
+            -- Benchmark each host against the team average
+            ROUND(avg_score - AVG(avg_score) OVER (), 1) as vs_team_score,
+            ROUND(discovery_depth_score - AVG(discovery_depth_score) OVER (), 1) as vs_team_discovery
+        FROM hosts
+        ORDER BY avg_score DESC
+        LIMIT 200
+"""
+
+TRENDS_SQL = """
+        -- Single scan over both weeks; each metric is a conditional aggregate
+        {select}
+            COUNTIF({partition} >= @this_week_start) as this_week_meetings,
+            COUNTIF({partition} >= @this_week_start AND qualified) as this_week_qualified,
+            ROUND(AVG(IF({partition} >= @this_week_start, total_qualified_sections, NULL)), 1) as this_week_avg_score,
+            COUNTIF({partition} < @this_week_start) as last_week_meetings,
+            COUNTIF({partition} < @this_week_start AND qualified) as last_week_qualified,
+            ROUND(AVG(IF({partition} < @this_week_start, total_qualified_sections, NULL)), 1) as last_week_avg_score
+        FROM {source}
+        WHERE {partition} BETWEEN @last_week_start AND @end_date
+"""
+
+TEAM_PERFORMANCE_SQL = """
+        {select}
+            creator_name as person_name,
+            ARRAY_AGG(
+                STRUCT(
+                    IFNULL(title, calendar_event_title) as title,
+                    total_qualified_sections as score,
+                    FORMAT_DATE('%d %b', date) as date
+                )
+                ORDER BY total_qualified_sections DESC, date DESC
+                LIMIT 10  -- Top conversations only; totals below still cover every meeting
+            ) as conversations,
+            SUM(total_qualified_sections) as total_score,
+            COUNT(*) as count,
+            ROUND(AVG(total_qualified_sections), 1) as average_score,
+            -- Team-wide figures computed over the per-person groups
+            SUM(COUNT(*)) OVER () as total_conversations,
+            ROUND(SUM(SUM(total_qualified_sections)) OVER () / SUM(COUNT(*)) OVER (), 1) as team_average
+        FROM {source}
+        WHERE {partition} BETWEEN @start_date AND @end_date
+            AND qualified = TRUE
+        GROUP BY creator_name
+        ORDER BY creator_name
+"""
+
+
+def _as_dict(row) -> Dict[str, Any]:
+    """Return a row as a dict, copying only BigQuery Row objects."""
+    # Rows unpacked from fused ARRAY<STRUCT> columns are already plain dicts
+    return row if isinstance(row, dict) else dict(row)
+
+
+def _row_dicts(rows) -> List[Dict[str, Any]]:
+    return [_as_dict(row) for row in rows]
+
+
+def _parse_now_pipeline(rows) -> List[Dict[str, Any]]:
+    return _row_dicts(rows)
+
+
+def _parse_client_concentration(rows) -> Dict[str, Any]:
+    results = _row_dicts(rows)
+    return {
+        "top_clients": results,
+        "unique_clients": len(results),
+    }
+
+
+def _parse_service_fit(rows) -> Dict[str, Any]:
+    results = []
+    total = 0
+    for row in rows:
+        row_dict = _as_dict(row)
+        results.append(row_dict)
+        total += row_dict.get("count", 0)
+
+    # Calculate percentages
+    for item in results:
+        item["percentage"] = round(100.0 * item["count"] / total, 1) if total > 0 else 0
+        item["avg_score"] = round(item.get("avg_score", 0), 1)
+
+    return {
+        "service_distribution": results,
+        "total_fit_opportunities": total,
+    }
+
+
+def _parse_deal_pipeline(rows) -> List[Dict[str, Any]]:
+    # Evidence is concatenated and truncated in SQL
+    return _row_dicts(rows)
+
+
+def _parse_blocker_patterns(rows) -> List[Dict[str, Any]]:
+    return _row_dicts(rows)
+
+
+def _parse_host_performance(rows) -> List[Dict[str, Any]]:
+    # Team benchmarks (vs_team_*) are computed in SQL
+    return _row_dicts(rows)
+
+
+def _parse_trends(rows) -> Dict[str, Any]:
+    first = next(iter(rows), None)
+
+    if first is not None:
+        data = _as_dict(first)
+
+        # Calculate deltas
+        trends = {
+            "this_week": {
+                "meetings": data.get("this_week_meetings", 0),
+                "qualified": data.get("this_week_qualified", 0),
+                "avg_score": data.get("this_week_avg_score", 0),
+            },
+            "last_week": {
+                "meetings": data.get("last_week_meetings", 0),
+                "qualified": data.get("last_week_qualified", 0),
+                "avg_score": data.get("last_week_avg_score", 0),
+            },
+            "deltas": {
+                "meetings_change": data.get("this_week_meetings", 0) - data.get("last_week_meetings", 0),
+                "qualified_change": data.get("this_week_qualified", 0) - data.get("last_week_qualified", 0),
+                "score_change": round(
+                    data.get("this_week_avg_score", 0) - data.get("last_week_avg_score", 0), 1
+                ),
+            },
+        }
+
+        # Calculate percentage changes
+        if data.get("last_week_meetings", 0) > 0:
+            trends["deltas"]["meetings_pct"] = round(
+                100.0 * trends["deltas"]["meetings_change"] / data["last_week_meetings"], 1
+            )
+        if data.get("last_week_qualified", 0) > 0:
+            trends["deltas"]["qualified_pct"] = round(
+                100.0 * trends["deltas"]["qualified_change"] / data["last_week_qualified"], 1
+            )
+
+        return trends
+
+    return {
+        "this_week": {"meetings": 0, "qualified": 0, "avg_score": 0},
+        "last_week": {"meetings": 0, "qualified": 0, "avg_score": 0},
+        "deltas": {"meetings_change": 0, "qualified_change": 0, "score_change": 0},
+    }
+
+
+def _parse_team_performance(rows) -> Dict[str, Any]:
+    # Rows arrive already grouped by person and sorted by name
+    team_list = []
+    total_conversations = 0
+    team_average = 0
+    for row in rows:
+        team_list.append({
+            "person_name": row["person_name"],
+            "conversations": row["conversations"],
+            "total_score": row["total_score"],
+            "count": row["count"],
+            "average_score": row["average_score"],
+        })
+        total_conversations = row["total_conversations"]
+        team_average = row["team_average"]
+
+    logger.info(f"Found {len(team_list)} people with {total_conversations} total conversations")
+
+    return {
+        "people": team_list,
+        "total_conversations": total_conversations,
+        "team_average": team_average,
+    }
+
+
+# Every section is bounded (LIMIT or per-person/per-host grouping) well below
+# this, so its rows arrive in a single page with no follow-up getQueryResults
+RESULT_PAGE_SIZE = 1000
+
+# Dashboard section name -> (SQL template, row parser, standalone method)
+DASHBOARD_SECTIONS: Dict[str, Tuple[str, Callable, str]] = {
+    "team_performance": (TEAM_PERFORMANCE_SQL, _parse_team_performance, "get_team_performance_table"),
+    "now_pipeline": (NOW_PIPELINE_SQL, _parse_now_pipeline, "get_now_pipeline"),
+    "client_concentration": (CLIENT_CONCENTRATION_SQL, _parse_client_concentration, "get_client_concentration"),
+    "service_fit": (SERVICE_FIT_SQL, _parse_service_fit, "get_service_fit_analysis"),
+    "deal_pipeline": (DEAL_PIPELINE_SQL, _parse_deal_pipeline, "get_deal_pipeline"),
+    "blocker_patterns": (BLOCKER_PATTERNS_SQL, _parse_blocker_patterns, "get_blocker_patterns"),
+    "host_performance": (HOST_PERFORMANCE_SQL, _parse_host_performance, "get_host_performance"),
+    "trends": (TRENDS_SQL, _parse_trends, "get_week_over_week_trends"),
+}
+
+
+class AnalyticsClient:
+    """Analytics client for advanced BigQuery queries and trend analysis."""
+
+    def __init__(self):
+        from zoneinfo import ZoneInfo
+
+        from app.bq import get_bigquery_client
+
+        self.client = get_bigquery_client()
+        self.table_id = config.FULL_TABLE_ID
+        self.tz = ZoneInfo(config.TIMEZONE)
+
+        # Read typed columns from the flat table when configured, else extract inline
+        if config.BQ_FLAT_TABLE:
+            self.source = f"`{config.BQ_FLAT_TABLE}`"
+        else:
+            self.source = f"(SELECT *, {TYPED_COLUMNS_SQL} FROM `{self.table_id}`)"
+
+        self._templates = {name: sql for name, (sql, _, _) in DASHBOARD_SECTIONS.items()}
+        if config.BQ_HOST_DAILY_VIEW:
+            self._templates["host_performance"] = HOST_PERFORMANCE_FROM_VIEW_SQL
+
+        # Render query text once; only parameters vary between calls, so repeat
+        # submissions are byte-identical and eligible for BigQuery's result cache
+        self._queries = {name: self._render(name, "SELECT", self.source) for name in self._templates}
+        self._dashboard_queries: Dict[Tuple[str, ...], str] = {}
+
+    def _render(self, name: str, select: str, source: str) -> str:
+        """Render a section template for the given SELECT form and source relation."""
+        return self._templates[name].format(
+            select=select,
+            source=source,
+            partition=config.BQ_PARTITION_COLUMN,
+            host_daily=config.BQ_HOST_DAILY_VIEW,
+        )
+
+    def _today(self) -> date:
         """
+        Today's date in the configured timezone.
 
-        job_config = bigquery.QueryJobConfig(
+        Query parameters are whole dates, so bindings stay identical all day and
+        BigQuery can serve repeated queries from its result cache.
+        """
+        return datetime.now(self.tz).date()
+
+    def _date_window(self, days: int) -> Dict[str, date]:
+        """Local-date query parameters covering the last `days` days through today."""
+        end_date = self._today()
+        start_date = end_date - timedelta(days=days)
+        return {"start_date": start_date, "end_date": end_date}
+
+    def _trend_window(self) -> Dict[str, date]:
+        """Local-date query parameters for this week vs last week."""
+        end_date = self._today()
+        this_week_start = end_date - timedelta(days=7)
+        last_week_start = end_date - timedelta(days=14)
+        return {
+            "end_date": end_date,
+            "this_week_start": this_week_start,
+            "last_week_start": last_week_start,
+        }
+
+    def _job_config(self, params: Dict[str, date]) -> "bigquery.QueryJobConfig":
+        """Build a cache-enabled job config binding DATE (or TIMESTAMP) parameters."""
+        from google.cloud import bigquery
+
+        return bigquery.QueryJobConfig(
             query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
+                bigquery.ScalarQueryParameter(
+                    name, "TIMESTAMP" if isinstance(value, datetime) else "DATE", value
+                )
+                for name, value in params.items()
+            ],
+            use_query_cache=True,
+        )
+
+    def _submit_query(self, section: str, params: Dict[str, date]) -> "bigquery.QueryJob":
+        """Start a section query against the base table without waiting for it."""
+        return self.client.query(self._queries[section], job_config=self._job_config(params))
+
+    def _run_query(self, section: str, params: Dict[str, date]):
+        """
+        Run a section query against the base table and return its rows.
+
+        query_and_wait() uses the jobs.query fast path, which returns the first
+        page of results with the response instead of polling the job and then
+        paging results in separate calls.
+        """
+        return self.client.query_and_wait(
+            self._queries[section], job_config=self._job_config(params), page_size=RESULT_PAGE_SIZE
+        )
+
+    def _dashboard_query(self, sections: Tuple[str, ...]) -> str:
+        """Build (once per section set) the fused query for get_full_dashboard."""
+        query = self._dashboard_queries.get(sections)
+        if query is None:
+            columns = ",\n".join(
+                f"ARRAY({self._render(name, 'SELECT AS STRUCT', 'filtered')}) AS {name}"
+                for name in sections
+            )
+            query = f"""
+        WITH filtered AS (
+            SELECT *
+            FROM {self.source}
+            WHERE {config.BQ_PARTITION_COLUMN} BETWEEN @scan_start AND @end_date
+        )
+        SELECT
+        {columns}
+        """
+            self._dashboard_queries[sections] = query
+        return query
+
+    def _section_params(self, name: str, days: int = 7) -> Dict[str, date]:
+        """Query parameters for a dashboard section."""
+        return self._trend_window() if name == "trends" else self._date_window(days)
+
+    def get_all_sections(
+        self, days: int = 7, sections: Tuple[str, ...] = tuple(DASHBOARD_SECTIONS)
+    ) -> Dict[str, Any]:
+        """
+        Fetch dashboard sections as separate, concurrently running BigQuery jobs.
+
+        All jobs are submitted before any result is awaited, so total latency is
+        that of the slowest section rather than the sum. A section that fails is
+        retried through its standalone method, which applies its usual default.
+        Not cached itself, since results may contain those defaults; the retried
+        sections are cached by _query_section.
+        """
+        jobs = {}
+        for name in sections:
+            try:
+                jobs[name] = self._submit_query(name, self._section_params(name, days))
+            except Exception as e:
+                logger.error(f"Failed to submit {name} query: {e}", exc_info=True)
+
+        results = {}
+        for name in sections:
+            try:
+                results[name] = DASHBOARD_SECTIONS[name][1](jobs[name].result(page_size=RESULT_PAGE_SIZE))
+            except Exception as e:
+                if name in jobs:
+                    logger.error(f"{name} query failed: {e}", exc_info=True)
+                results[name] = self._fetch_section(name, days)
+        return results
+
+    def get_full_dashboard(
+        self, days: int = 7, sections: Tuple[str, ...] = tuple(DASHBOARD_SECTIONS)
+    ) -> Dict[str, Any]:
+        """
+        Fetch several dashboard sections with a single BigQuery job.
+
+        Each section query reads a common `filtered` CTE and is packed into an
+        ARRAY<STRUCT> column, so the whole dashboard comes back as one row in one
+        round-trip. BigQuery doesn't materialize non-recursive CTEs, so each section
+        still scans the date range itself; the saving is in jobs, not bytes. Falls back to the per-section methods if the fused query fails;
+        only a successful fused result is cached.
+        """
+        try:
+            return self._fused_dashboard(days, tuple(sections))
+        except Exception as e:
+            logger.error(f"Fused dashboard query failed, falling back to per-section queries: {e}", exc_info=True)
+            return self.get_all_sections(days, sections=sections)
+
+    @ttl_cache(seconds=config.ANALYTICS_CACHE_TTL)
+    def _fused_dashboard(self, days: int, sections: Tuple[str, ...]) -> Dict[str, Any]:
+        """Run the fused dashboard query; raises on failure so errors are never cached."""
+        params = {**self._date_window(days), **self._trend_window()}
+        params["scan_start"] = min(params["start_date"], params["last_week_start"])
+
+        query = self._dashboard_query(sections)
+
+        logger.info(f"Fetching {len(sections)} dashboard sections for last {days} days in one query")
+        row = next(iter(self.client.query_and_wait(query, job_config=self._job_config(params))))
+        return {name: DASHBOARD_SECTIONS[name][1](row[name] or []) for name in sections}
+
+    @ttl_cache(seconds=config.ANALYTICS_CACHE_TTL)
+    def _query_section(self, name: str, days: int = 7) -> Any:
+        """Run and parse one section query; raises on failure so errors are never cached."""
+        return DASHBOARD_SECTIONS[name][1](self._run_query(name, self._section_params(name, days)))
+
+    def _fetch_section(self, name: str, days: int = 7) -> Any:
+        """Fetch one dashboard section through its standalone method."""
+        method = getattr(self, DASHBOARD_SECTIONS[name][2])
+        # Week-over-week trends use fixed windows and take no `days` argument
+        return method() if name == "trends" else method(days)
+
+    def refresh_flat_table(self) -> bool:
+        """
+        Rebuild the typed flat table from the base table.
+
+        Intended to run nightly (e.g. from Cloud Scheduler). Returns False if no
+        flat table is configured or the rebuild fails.
+        """
+        if not config.BQ_FLAT_TABLE:
+            logger.warning("BQ_FLAT_TABLE not set, skipping flat table refresh")
+            return False
+
+        query = FLAT_TABLE_SQL.format(
+            flat_table=config.BQ_FLAT_TABLE,
+            table=self.table_id,
+            typed_columns=TYPED_COLUMNS_SQL,
         )
 
         try:
-            query_job = self.client.query(query, job_config=job_config)
-            results = [dict(row.items()) for row in query_job.result()]
+            logger.info(f"Refreshing flat table {config.BQ_FLAT_TABLE}")
+            self.client.query_and_wait(query)
+            invalidate_cache()
+            return True
+        except Exception as e:
+            logger.error(f"Flat table refresh failed: {e}", exc_info=True)
+            return False
 
-            return {
-                "top_clients": results,
-                "unique_clients": len(results),
-            }
+    def create_host_daily_view(self) -> bool:
+        """Create the host_daily materialized view if it doesn't already exist."""
+        if not config.BQ_HOST_DAILY_VIEW:
+            logger.warning("BQ_HOST_DAILY_VIEW not set, skipping view creation")
+            return False
+
+        try:
+            logger.info(f"Creating materialized view {config.BQ_HOST_DAILY_VIEW}")
+            self.client.query_and_wait(HOST_DAILY_VIEW_SQL.format(view=config.BQ_HOST_DAILY_VIEW, table=self.table_id))
+            return True
+        except Exception as e:
+            logger.error(f"Materialized view creation failed: {e}", exc_info=True)
+            return False
+
+    def get_now_pipeline(self, days: int = 7) -> List[Dict[str, Any]]:
+        """
+        Fetch top scoring qualified meetings, prioritizing highest scores.
+
+        Since all meetings have NOW=true in this dataset, we focus on highest scores.
+        """
+        logger.info(f"Fetching NOW pipeline for last {days} days")
+
+        try:
+            results = self._query_section("now_pipeline", days)
+            logger.info(f"Found {len(results)} urgent opportunities")
+            return results
+        except Exception as e:
+            logger.error(f"NOW pipeline query failed: {e}", exc_info=True)
+            return []
+
+    def get_client_concentration(self, days: int = 7) -> Dict[str, Any]:
+        """
+        Analyze client engagement patterns.
+
+        Returns top clients, new vs returning ratio, and engagement depth.
+        """
+        try:
+            return self._query_section("client_concentration", days)
         except Exception as e:
             logger.error(f"Client concentration query failed: {e}", exc_info=True)
             return {"top_clients": [], "unique_clients": 0}
@@ -157,48 +799,8 @@ class AnalyticsClient:
 
         Returns distribution of opportunities by service type.
         """
-        end_date = datetime.now(self.tz)
-        # Set start_date to beginning of day to capture all meetings from that date
-        start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        query = f"""
-        SELECT
-            JSON_VALUE(fit, '$.services[0]') as primary_service,
-            COUNT(*) as count,
-            AVG(total_qualified_sections) as avg_score
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-            AND qualified = TRUE
-            AND JSON_VALUE(fit, '$.qualified') = 'true'
-        GROUP BY primary_service
-        ORDER BY count DESC
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
-        )
-
         try:
-            query_job = self.client.query(query, job_config=job_config)
-            results = []
-            total = 0
-            for row in query_job.result():
-                row_dict = dict(row.items())
-                results.append(row_dict)
-                total += row_dict.get("count", 0)
-
-            # Calculate percentages
-            for item in results:
-                item["percentage"] = round(100.0 * item["count"] / total, 1) if total > 0 else 0
-                item["avg_score"] = round(item.get("avg_score", 0), 1)
-
-            return {
-                "service_distribution": results,
-                "total_fit_opportunities": total,
-            }
+            return self._query_section("service_fit", days)
         except Exception as e:
             logger.error(f"Service fit analysis failed: {e}", exc_info=True)
             return {"service_distribution": [], "total_fit_opportunities": 0}
@@ -209,62 +811,9 @@ class AnalyticsClient:
 
         Returns meetings with commercial numbers for deal tracking.
         """
-        end_date = datetime.now(self.tz)
-        # Set start_date to beginning of day to capture all meetings from that date
-        start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        query = f"""
-        SELECT
-            IFNULL(JSON_VALUE(client_info, '$.client'), 'Unknown Client') as client,
-            IFNULL(title, calendar_event_title) as meeting_title,
-            FORMAT_DATE('%d %b %Y', date) as meeting_date,
-            creator_name as owner,
-            -- Extract all evidence that might contain numbers
-            JSON_VALUE(now, '$.evidence') as now_evidence,
-            JSON_VALUE(measure, '$.evidence') as measure_evidence,
-            JSON_VALUE(blocker, '$.evidence') as blocker_evidence,
-            -- Granola link for full context
-            IFNULL(granola_link, '') as meeting_link
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-            AND qualified = TRUE
-            AND (
-                REGEXP_CONTAINS(JSON_VALUE(now, '$.evidence'), r'[£$][0-9]') OR
-                REGEXP_CONTAINS(JSON_VALUE(measure, '$.evidence'), r'[£$][0-9]') OR
-                REGEXP_CONTAINS(JSON_VALUE(blocker, '$.evidence'), r'[£$][0-9]') OR
-                REGEXP_CONTAINS(JSON_VALUE(now, '$.evidence'), r'\d+[kK]') OR
-                REGEXP_CONTAINS(JSON_VALUE(measure, '$.evidence'), r'\d+[kK]') OR
-                REGEXP_CONTAINS(JSON_VALUE(blocker, '$.evidence'), r'\d+[kK]')
-            )
-        ORDER BY scored_at DESC
-        LIMIT 30
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
-        )
-
         try:
             logger.info(f"Fetching deal pipeline with budget mentions")
-            results = self.client.query(query, job_config=job_config).result()
-
-            deals = []
-            for row in results:
-                # Extract all numbers from evidence
-                all_evidence = f"{row.now_evidence or ''} {row.measure_evidence or ''} {row.blocker_evidence or ''}"
-
-                deals.append({
-                    "client": row.client,
-                    "meeting_title": row.meeting_title,
-                    "meeting_date": row.meeting_date,
-                    "owner": row.owner,
-                    "evidence_with_numbers": all_evidence[:500],  # Truncate for readability
-                    "meeting_link": row.meeting_link,
-                })
-
+            deals = self._query_section("deal_pipeline", days)
             logger.info(f"Found {len(deals)} meetings with budget/revenue mentions")
             return deals
 
@@ -278,33 +827,8 @@ class AnalyticsClient:
 
         Returns top blockers with evidence and frequency.
         """
-        end_date = datetime.now(self.tz)
-        # Set start_date to beginning of day to capture all meetings from that date
-        start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        query = f"""
-        SELECT
-            JSON_VALUE(blocker, '$.summary') as blocker_type,
-            JSON_VALUE(blocker, '$.evidence') as evidence,
-            COUNT(*) as frequency
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-            AND JSON_VALUE(blocker, '$.qualified') = 'true'
-        GROUP BY blocker_type, evidence
-        ORDER BY frequency DESC
-        LIMIT 5
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
-        )
-
         try:
-            query_job = self.client.query(query, job_config=job_config)
-            results = [dict(row.items()) for row in query_job.result()]
+            results = self._query_section("blocker_patterns", days)
             logger.info(f"Found {len(results)} blocker patterns")
             return results
         except Exception as e:
@@ -317,60 +841,8 @@ class AnalyticsClient:
 
         Returns per-host metrics including quality indicators.
         """
-        end_date = datetime.now(self.tz)
-        # Set start_date to beginning of day to capture all meetings from that date
-        start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        query = f"""
-        SELECT
-            creator_email,
-            creator_name,
-            COUNT(*) as total_meetings,
-            COUNTIF(qualified = TRUE) as qualified_meetings,
-            ROUND(AVG(total_qualified_sections), 1) as avg_score,
-
-            -- Discovery depth metrics
-            ROUND(100.0 * AVG(CASE WHEN JSON_VALUE(now, '$.qualified') = 'true' THEN 1 ELSE 0 END), 1) as now_rate,
-            ROUND(100.0 * AVG(CASE WHEN JSON_VALUE(next, '$.qualified') = 'true' THEN 1 ELSE 0 END), 1) as next_rate,
-            ROUND(100.0 * AVG(CASE WHEN JSON_VALUE(measure, '$.qualified') = 'true' THEN 1 ELSE 0 END), 1) as measure_rate,
-            ROUND(100.0 * AVG(CASE WHEN JSON_VALUE(blocker, '$.qualified') = 'true' THEN 1 ELSE 0 END), 1) as blocker_rate,
-            ROUND(100.0 * AVG(CASE WHEN JSON_VALUE(fit, '$.qualified') = 'true' THEN 1 ELSE 0 END), 1) as fit_rate,
-
-            -- Quality score (average of discovery rates)
-            ROUND(100.0 * AVG(
-                (CASE WHEN JSON_VALUE(now, '$.qualified') = 'true' THEN 1 ELSE 0 END +
-                 CASE WHEN JSON_VALUE(measure, '$.qualified') = 'true' THEN 1 ELSE 0 END +
-                 CASE WHEN JSON_VALUE(blocker, '$.qualified') = 'true' THEN 1 ELSE 0 END) / 3.0
-            ), 1) as discovery_depth_score
-
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-            AND creator_email IS NOT NULL
-        GROUP BY creator_email, creator_name
-        HAVING total_meetings >= 2  -- Only show hosts with multiple meetings
-        ORDER BY avg_score DESC
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
-        )
-
         try:
-            query_job = self.client.query(query, job_config=job_config)
-            results = [dict(row.items()) for row in query_job.result()]
-
-            # Calculate team averages for benchmarking
-            if results:
-                team_avg_score = sum(r["avg_score"] for r in results) / len(results)
-                team_avg_discovery = sum(r["discovery_depth_score"] for r in results) / len(results)
-
-                for host in results:
-                    host["vs_team_score"] = round(host["avg_score"] - team_avg_score, 1)
-                    host["vs_team_discovery"] = round(host["discovery_depth_score"] - team_avg_discovery, 1)
-
+            results = self._query_section("host_performance", days)
             logger.info(f"Analyzed performance for {len(results)} hosts")
             return results
         except Exception as e:
@@ -383,92 +855,8 @@ class AnalyticsClient:
 
         Returns comparison of this week vs last week.
         """
-        end_date = datetime.now(self.tz)
-        # Set week boundaries to beginning of day
-        this_week_start = (end_date - timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
-        last_week_start = (end_date - timedelta(days=14)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        query = f"""
-        WITH this_week AS (
-            SELECT
-                COUNT(*) as meetings,
-                COUNTIF(qualified = TRUE) as qualified,
-                AVG(total_qualified_sections) as avg_score
-            FROM `{self.table_id}`
-            WHERE TIMESTAMP(date) BETWEEN @this_week_start AND @end_date
-        ),
-        last_week AS (
-            SELECT
-                COUNT(*) as meetings,
-                COUNTIF(qualified = TRUE) as qualified,
-                AVG(total_qualified_sections) as avg_score
-            FROM `{self.table_id}`
-            WHERE TIMESTAMP(date) BETWEEN @last_week_start AND @this_week_start
-        )
-        SELECT
-            tw.meetings as this_week_meetings,
-            tw.qualified as this_week_qualified,
-            ROUND(tw.avg_score, 1) as this_week_avg_score,
-            lw.meetings as last_week_meetings,
-            lw.qualified as last_week_qualified,
-            ROUND(lw.avg_score, 1) as last_week_avg_score
-        FROM this_week tw, last_week lw
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-                bigquery.ScalarQueryParameter("this_week_start", "TIMESTAMP", this_week_start),
-                bigquery.ScalarQueryParameter("last_week_start", "TIMESTAMP", last_week_start),
-            ]
-        )
-
         try:
-            query_job = self.client.query(query, job_config=job_config)
-            results = list(query_job.result())
-
-            if results:
-                data = dict(results[0].items())
-
-                # Calculate deltas
-                trends = {
-                    "this_week": {
-                        "meetings": data.get("this_week_meetings", 0),
-                        "qualified": data.get("this_week_qualified", 0),
-                        "avg_score": data.get("this_week_avg_score", 0),
-                    },
-                    "last_week": {
-                        "meetings": data.get("last_week_meetings", 0),
-                        "qualified": data.get("last_week_qualified", 0),
-                        "avg_score": data.get("last_week_avg_score", 0),
-                    },
-                    "deltas": {
-                        "meetings_change": data.get("this_week_meetings", 0) - data.get("last_week_meetings", 0),
-                        "qualified_change": data.get("this_week_qualified", 0) - data.get("last_week_qualified", 0),
-                        "score_change": round(
-                            data.get("this_week_avg_score", 0) - data.get("last_week_avg_score", 0), 1
-                        ),
-                    },
-                }
-
-                # Calculate percentage changes
-                if data.get("last_week_meetings", 0) > 0:
-                    trends["deltas"]["meetings_pct"] = round(
-                        100.0 * trends["deltas"]["meetings_change"] / data["last_week_meetings"], 1
-                    )
-                if data.get("last_week_qualified", 0) > 0:
-                    trends["deltas"]["qualified_pct"] = round(
-                        100.0 * trends["deltas"]["qualified_change"] / data["last_week_qualified"], 1
-                    )
-
-                return trends
-
-            return {
-                "this_week": {"meetings": 0, "qualified": 0, "avg_score": 0},
-                "last_week": {"meetings": 0, "qualified": 0, "avg_score": 0},
-                "deltas": {"meetings_change": 0, "qualified_change": 0, "score_change": 0},
-            }
-
+            return self._query_section("trends")
         except Exception as e:
             logger.error(f"Week-over-week trends query failed: {e}", exc_info=True)
             return {
@@ -483,68 +871,9 @@ class AnalyticsClient:
 
         Returns meetings for each person with their scores and averages.
         """
-        end_date = datetime.now(self.tz)
-        # Set start_date to beginning of day to capture all meetings from that date
-        start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        query = f"""
-        SELECT
-            creator_name as person_name,
-            IFNULL(title, calendar_event_title) as conversation_title,
-            total_qualified_sections as score,
-            FORMAT_DATE('%d %b', date) as date_short
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-            AND qualified = TRUE
-        ORDER BY creator_name, total_qualified_sections DESC, date DESC
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
-        )
-
         try:
             logger.info(f"Fetching team performance table for last {days} days")
-            results = self.client.query(query, job_config=job_config).result()
-
-            # Group by person and calculate averages
-            people_data = {}
-            for row in results:
-                person = row.person_name
-                if person not in people_data:
-                    people_data[person] = {
-                        "person_name": person,
-                        "conversations": [],
-                        "total_score": 0,
-                        "count": 0
-                    }
-
-                people_data[person]["conversations"].append({
-                    "title": row.conversation_title,
-                    "score": row.score,
-                    "date": row.date_short
-                })
-                people_data[person]["total_score"] += row.score
-                people_data[person]["count"] += 1
-
-            # Calculate averages
-            for person in people_data.values():
-                person["average_score"] = round(person["total_score"] / person["count"], 1) if person["count"] > 0 else 0
-
-            # Convert to list and sort by person name
-            team_list = list(people_data.values())
-            team_list.sort(key=lambda x: x["person_name"])
-
-            logger.info(f"Found {len(team_list)} people with {sum(p['count'] for p in team_list)} total conversations")
-
-            return {
-                "people": team_list,
-                "total_conversations": sum(p["count"] for p in team_list),
-                "team_average": round(sum(p["total_score"] for p in team_list) / sum(p["count"] for p in team_list), 1) if team_list else 0
-            }
+            return self._query_section("team_performance", days)
 
         except Exception as e:
             logger.error(f"Team performance table query failed: {e}", exc_info=True)
@@ -553,11 +882,14 @@ class AnalyticsClient:
 
 # Lazy-loaded global instance
 _analytics_client = None
+_analytics_client_lock = threading.Lock()
 
 
 def get_analytics_client() -> AnalyticsClient:
     """Get or create analytics client instance."""
     global _analytics_client
     if _analytics_client is None:
-        _analytics_client = AnalyticsClient()
-    return _analytics_client
\ No newline at end of file
+        with _analytics_client_lock:
+            if _analytics_client is None:
+                _analytics_client = AnalyticsClient()
+    return _analytics_client
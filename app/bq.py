@@ -1,90 +1,63 @@
 """BigQuery helpers for fetching meeting intelligence data."""
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
-from google.cloud import bigquery
-
+from app.analytics import get_analytics_client, ttl_cache
 from app.config import config
 
 logger = logging.getLogger(__name__)
 
+# HTTP connections kept per host. The requests default of 10 is exhausted as
+# soon as two dashboard loads overlap, each submitting eight section queries
+BQ_HTTP_POOL_SIZE = 64
 
-class BigQueryClient:
-    """BigQuery client wrapper."""
+_TZ = ZoneInfo(config.TIMEZONE)
 
-    def __init__(self):
-        self.client = bigquery.Client(project=config.BQ_PROJECT_ID)
-        self.table_id = config.get_full_table_id()
+_bigquery_client = None
+_bigquery_client_lock = threading.Lock()
 
-    def _get_date_window(self, days: int = 7) -> tuple[datetime, datetime]:
-        """Get date window for queries in Europe/London timezone."""
-        tz = ZoneInfo(config.TIMEZONE)
-        now = datetime.now(tz)
-        end_date = now.replace(hour=23, minute=59, second=59)
-        start_date = end_date - timedelta(days=days)
-        return start_date, end_date
+# Runs small side queries alongside the fused dashboard query
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bq")
 
-    def fetch_insights_data_v2(self, days: int = 7) -> Dict[str, Any]:
-        """
-        Fetch comprehensive business intelligence data for insights mode.
 
-        Returns structured data with NOW pipeline, client intelligence,
-        service patterns, and blockers.
-        """
-        from app.analytics import get_analytics_client
-        analytics = get_analytics_client()
+def get_bigquery_client():
+    """Get or create the process-wide google.cloud.bigquery.Client."""
+    global _bigquery_client
+    if _bigquery_client is None:
+        with _bigquery_client_lock:
+            if _bigquery_client is None:
+                # Imported here so app startup doesn't pay for the BigQuery client stack
+                from google.cloud import bigquery
+                from requests.adapters import HTTPAdapter
 
-        # Gather all intelligence data
-        return {
-            "team_performance": analytics.get_team_performance_table(days),
-            "now_pipeline": analytics.get_now_pipeline(days),
-            "client_concentration": analytics.get_client_concentration(days),
-            "service_fit": analytics.get_service_fit_analysis(days),
-            "blocker_patterns": analytics.get_blocker_patterns(days),
-            "trends": analytics.get_week_over_week_trends(),
-            "summary_metrics": self._get_summary_metrics(days),
-        }
+                client = bigquery.Client(project=config.BQ_PROJECT_ID)
+                client._http.mount(
+                    "https://",
+                    HTTPAdapter(pool_connections=BQ_HTTP_POOL_SIZE, pool_maxsize=BQ_HTTP_POOL_SIZE),
+                )
+                _bigquery_client = client
+    return _bigquery_client
 
-    def _get_summary_metrics(self, days: int = 7) -> Dict[str, Any]:
-        """Get basic summary metrics for the period."""
-        start_date, end_date = self._get_date_window(days)
 
-        query = f"""
+# Query templates, rendered against the configured table once per client
+SUMMARY_METRICS_SQL = """
         SELECT
             COUNT(*) as total_meetings,
             COUNTIF(qualified = TRUE) as qualified_meetings,
             ROUND(AVG(total_qualified_sections), 1) as avg_score,
             ROUND(100.0 * COUNTIF(qualified = TRUE) / COUNT(*), 1) as pct_qualified
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
-        )
-
-        try:
-            query_job = self.client.query(query, job_config=job_config)
-            results = list(query_job.result())
-            return dict(results[0].items()) if results else {}
-        except Exception as e:
-            logger.error(f"Summary metrics query failed: {e}", exc_info=True)
-            return {}
-
-    def fetch_insights_data(self, days: int = 7, limit: int = 25) -> List[Dict[str, Any]]:
-        """
-        Fetch qualified meetings for insights mode.
-
-        Returns top meetings by total_qualified_sections, ordered by score DESC.
-        """
-        start_date, end_date = self._get_date_window(days)
+        FROM `{table}`
+        WHERE {partition} BETWEEN @start_date AND @end_date
+"""
 
-        query = f"""
+INSIGHTS_SQL = """
         SELECT
             meeting_id,
             date,
@@ -102,50 +75,220 @@ class BigQueryClient:
             results,
             offering,
             scored_at
-        FROM `{self.table_id}`
+        FROM `{table}`
         WHERE
             scored_at BETWEEN @start_date AND @end_date
             AND qualified = TRUE
         ORDER BY total_qualified_sections DESC, scored_at DESC
         LIMIT @limit
+"""
+
+# Coaching summary, desk leaderboard, criteria prevalence and sample meetings,
+# derived from one scan of the window and returned as a single row
+COACHING_SQL = """
+        WITH base AS (
+            SELECT *
+            FROM `{table}`
+            WHERE {partition} BETWEEN @start_date AND @end_date
+        )
+        SELECT
+            -- Summary metrics
+            (
+                SELECT AS STRUCT
+                    COUNT(*) as total_meetings,
+                    COUNTIF(qualified = TRUE) as qualified_meetings,
+                    AVG(total_qualified_sections) as avg_score,
+                    ROUND(100.0 * COUNTIF(qualified = TRUE) / COUNT(*), 1) as pct_qualified
+                FROM base
+            ) as summary,
+
+            -- Leaderboard by desk
+            ARRAY(
+                SELECT AS STRUCT
+                    desk,
+                    COUNT(*) as num_calls,
+                    COUNTIF(qualified = TRUE) as qualified_calls,
+                    ROUND(AVG(total_qualified_sections), 1) as avg_score,
+                    ROUND(100.0 * COUNTIF(qualified = TRUE) / COUNT(*), 1) as pct_qualified
+                FROM base
+                GROUP BY desk
+                ORDER BY avg_score DESC
+                LIMIT 5
+            ) as leaderboard,
+
+            -- Low-signal analysis (criteria prevalence)
+            (
+                SELECT AS STRUCT
+                    ROUND(100.0 * COUNTIF(JSON_VALUE(now, '$.qualified') = 'true') / COUNT(*), 1) as pct_now,
+                    ROUND(100.0 * COUNTIF(JSON_VALUE(next, '$.qualified') = 'true') / COUNT(*), 1) as pct_next,
+                    ROUND(100.0 * COUNTIF(JSON_VALUE(measure, '$.qualified') = 'true') / COUNT(*), 1) as pct_measure,
+                    ROUND(100.0 * COUNTIF(JSON_VALUE(blocker, '$.qualified') = 'true') / COUNT(*), 1) as pct_blocker
+                FROM base
+                WHERE qualified = TRUE
+            ) as signal_analysis,
+
+            -- Sample meetings for context
+            ARRAY(
+                SELECT AS STRUCT
+                    meeting_id,
+                    date,
+                    desk,
+                    title,
+                    total_qualified_sections,
+                    -- Evidence extracted in BigQuery rather than per row in Python
+                    COALESCE(JSON_VALUE(now, '$.evidence'), JSON_VALUE(now, '$.reasoning')) as now_evidence,
+                    COALESCE(JSON_VALUE(next, '$.evidence'), JSON_VALUE(next, '$.reasoning')) as next_evidence,
+                    COALESCE(JSON_VALUE(measure, '$.evidence'), JSON_VALUE(measure, '$.reasoning')) as measure_evidence,
+                    COALESCE(JSON_VALUE(blocker, '$.evidence'), JSON_VALUE(blocker, '$.reasoning')) as blocker_evidence,
+                    COALESCE(JSON_VALUE(fit, '$.evidence'), JSON_VALUE(fit, '$.reasoning')) as fit_evidence
+                FROM base
+                WHERE qualified = TRUE
+                ORDER BY total_qualified_sections DESC
+                LIMIT 10
+            ) as sample_meetings
+"""
+
+
+@lru_cache(maxsize=16)
+def _date_window(days: int, hour_bucket: int) -> tuple[datetime, datetime]:
+    """Compute the date window once per (days, hour) pair."""
+    now = datetime.now(_TZ)
+    end_date = now.replace(hour=23, minute=59, second=59)
+    start_date = end_date - timedelta(days=days)
+    return start_date, end_date
+
+
+# Host performance metrics averaged into the team benchmarks
+_BENCHMARK_METRICS = ("avg_score", "discovery_depth_score", "now_rate", "measure_rate", "blocker_rate")
+
+
+def _host_averages(host_performance: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Average each benchmark metric across hosts, reducing one column at a time."""
+    if not host_performance:
+        return {}
+
+    # map/itemgetter/sum keep each column reduction in C rather than a Python loop
+    n = len(host_performance)
+    return {metric: sum(map(itemgetter(metric), host_performance)) / n for metric in _BENCHMARK_METRICS}
+
+
+class BigQueryClient:
+    """BigQuery client wrapper."""
+
+    def __init__(self):
+        self.client = get_bigquery_client()
+        self.table_id = config.FULL_TABLE_ID
+
+        # Query text never changes for a client, so build it once
+        self._queries = {
+            name: sql.format(table=self.table_id, partition=config.BQ_PARTITION_COLUMN)
+            for name, sql in (
+                ("summary_metrics", SUMMARY_METRICS_SQL),
+                ("insights", INSIGHTS_SQL),
+                ("coaching", COACHING_SQL),
+            )
+        }
+
+    def _get_date_window(self, days: int = 7) -> tuple[datetime, datetime]:
+        """Get date window for queries in Europe/London timezone."""
+        # Local midnight always falls on an hour boundary, so the window is
+        # stable within an hour
+        return _date_window(days, int(time.time() // 3600))
+
+    def _get_day_window(self, days: int = 7) -> tuple[date, date]:
+        """Get the local dates covered by _get_date_window, for partition filters."""
+        start_date, end_date = self._get_date_window(days)
+        return start_date.date() + timedelta(days=1), end_date.date()
+
+    def _job_config(self, start: date, end: date, extra: tuple = ()) -> Any:
+        """
+        Build a job config binding the @start_date/@end_date window.
+
+        Dates bind as DATE (partition filters) and datetimes as TIMESTAMP.
+        `extra` holds additional (name, type, value) parameter tuples.
         """
+        from google.cloud import bigquery
 
-        job_config = bigquery.QueryJobConfig(
+        window_type = "TIMESTAMP" if isinstance(start, datetime) else "DATE"
+        return bigquery.QueryJobConfig(
             query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-                bigquery.ScalarQueryParameter("limit", "INT64", limit),
+                bigquery.ScalarQueryParameter("start_date", window_type, start),
+                bigquery.ScalarQueryParameter("end_date", window_type, end),
+                *(bigquery.ScalarQueryParameter(*param) for param in extra),
             ]
         )
 
+    def fetch_insights_data_v2(self, days: int = 7) -> Dict[str, Any]:
+        """
+        Fetch comprehensive business intelligence data for insights mode.
+
+        Returns structured data with NOW pipeline, client intelligence,
+        service patterns, and blockers.
+        """
+        analytics = get_analytics_client()
+
+        # Run the summary query while the dashboard query executes
+        summary = _executor.submit(self._summary_metrics, days)
+
+        # Gather all intelligence data in a single BigQuery job
+        data = analytics.get_full_dashboard(
+            days,
+            sections=(
+                "team_performance",
+                "now_pipeline",
+                "client_concentration",
+                "service_fit",
+                "blocker_patterns",
+                "trends",
+            ),
+        )
+        # The dashboard dict is shared with the analytics cache, so extend a copy
+        return {**data, "summary_metrics": summary.result()}
+
+    def _summary_metrics(self, days: int = 7) -> Dict[str, Any]:
+        """Get basic summary metrics for the period, or {} if the query fails."""
+        try:
+            return self._get_summary_metrics(days)
+        except Exception as e:
+            logger.error(f"Summary metrics query failed: {e}", exc_info=True)
+            return {}
+
+    @ttl_cache(seconds=3600)
+    def _get_summary_metrics(self, days: int = 7) -> Dict[str, Any]:
+        """Run the summary metrics query (memoized per hour; failures raise and are not cached)."""
+        start_date, end_date = self._get_day_window(days)
+
+        query = self._queries["summary_metrics"]
+
+        job_config = self._job_config(start_date, end_date)
+
+        results = list(self.client.query_and_wait(query, job_config=job_config))
+        return dict(results[0]) if results else {}
+
+    def fetch_insights_data(self, days: int = 7, limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Fetch qualified meetings for insights mode.
+
+        Returns top meetings by total_qualified_sections, ordered by score DESC.
+        """
+        start_date, end_date = self._get_date_window(days)
+
+        query = self._queries["insights"]
+
+        job_config = self._job_config(start_date, end_date, extra=(("limit", "INT64", limit),))
+
         logger.info(
             f"Fetching insights data: {start_date.isoformat()} to {end_date.isoformat()}, limit={limit}"
         )
 
         try:
-            query_job = self.client.query(query, job_config=job_config)
-            results = query_job.result()
-
-            rows = []
-            for row in results:
-                row_dict = dict(row.items())
-                # Convert JSON fields to dict if they're strings
-                if isinstance(row_dict.get("client_info"), str):
-                    import json
-                    try:
-                        row_dict["client_info"] = json.loads(row_dict["client_info"])
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-
-                # Parse JSON scoring fields
-                for field in ["now", "next", "measure", "blocker", "fit"]:
-                    if isinstance(row_dict.get(field), str):
-                        try:
-                            row_dict[field] = json.loads(row_dict[field])
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-
-                rows.append(row_dict)
+            # query_and_wait() takes the jobs.query fast path, so the (at most
+            # `limit`) rows come back with the query response in one round trip
+            results = self.client.query_and_wait(query, job_config=job_config)
+
+            # client_info and the scoring fields are JSON columns, which the client
+            # library already decodes into dicts
+            rows = [dict(row) for row in results]
 
             logger.info(f"Fetched {len(rows)} qualified meetings for insights")
             return rows
@@ -160,26 +303,24 @@ class BigQueryClient:
 
         Returns host performance, team benchmarks, and improvement areas.
         """
-        from app.analytics import get_analytics_client
         analytics = get_analytics_client()
 
-        # Get host performance metrics
-        host_performance = analytics.get_host_performance(days)
+        # Run the summary query while the dashboard query executes
+        summary = _executor.submit(self._summary_metrics, days)
+
+        # Get host performance metrics and trends in one query
+        dashboard = analytics.get_full_dashboard(days, sections=("host_performance", "trends"))
+        host_performance = dashboard["host_performance"]
 
         # Calculate team benchmarks
-        if host_performance:
+        averages = _host_averages(host_performance)
+        if averages:
             team_benchmarks = {
-                "avg_score": round(sum(h["avg_score"] for h in host_performance) / len(host_performance), 1),
-                "avg_discovery_depth": round(
-                    sum(h["discovery_depth_score"] for h in host_performance) / len(host_performance), 1
-                ),
-                "avg_now_rate": round(sum(h["now_rate"] for h in host_performance) / len(host_performance), 1),
-                "avg_measure_rate": round(
-                    sum(h["measure_rate"] for h in host_performance) / len(host_performance), 1
-                ),
-                "avg_blocker_rate": round(
-                    sum(h["blocker_rate"] for h in host_performance) / len(host_performance), 1
-                ),
+                "avg_score": round(averages["avg_score"], 1),
+                "avg_discovery_depth": round(averages["discovery_depth_score"], 1),
+                "avg_now_rate": round(averages["now_rate"], 1),
+                "avg_measure_rate": round(averages["measure_rate"], 1),
+                "avg_blocker_rate": round(averages["blocker_rate"], 1),
             }
         else:
             team_benchmarks = {}
@@ -187,21 +328,25 @@ class BigQueryClient:
         return {
             "host_performance": host_performance,
             "team_benchmarks": team_benchmarks,
-            "trends": analytics.get_week_over_week_trends(),
-            "summary": self._get_summary_metrics(days),
+            "trends": dashboard["trends"],
+            "summary": summary.result(),
             "top_performers": host_performance[:3] if host_performance else [],
-            "improvement_areas": self._identify_improvement_areas(host_performance),
+            "improvement_areas": self._identify_improvement_areas(host_performance, averages),
         }
 
-    def _identify_improvement_areas(self, host_performance: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _identify_improvement_areas(
+        self, host_performance: List[Dict[str, Any]], averages: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
         """Identify team-wide improvement areas based on discovery metrics."""
         if not host_performance:
             return {}
 
         # Calculate average rates
-        avg_now = sum(h["now_rate"] for h in host_performance) / len(host_performance)
-        avg_measure = sum(h["measure_rate"] for h in host_performance) / len(host_performance)
-        avg_blocker = sum(h["blocker_rate"] for h in host_performance) / len(host_performance)
+        if averages is None:
+            averages = _host_averages(host_performance)
+        avg_now = averages["now_rate"]
+        avg_measure = averages["measure_rate"]
+        avg_blocker = averages["blocker_rate"]
 
         improvements = []
 
@@ -241,101 +386,23 @@ class BigQueryClient:
         - low_signal_analysis: criteria prevalence
         - sample_meetings: top 10 for context
         """
-        start_date, end_date = self._get_date_window(days)
-
-        # Summary metrics
-        summary_query = f"""
-        SELECT
-            COUNT(*) as total_meetings,
-            COUNTIF(qualified = TRUE) as qualified_meetings,
-            AVG(total_qualified_sections) as avg_score,
-            ROUND(100.0 * COUNTIF(qualified = TRUE) / COUNT(*), 1) as pct_qualified
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-        """
+        start_date, end_date = self._get_day_window(days)
 
-        # Leaderboard by desk
-        leaderboard_query = f"""
-        SELECT
-            desk,
-            COUNT(*) as num_calls,
-            COUNTIF(qualified = TRUE) as qualified_calls,
-            ROUND(AVG(total_qualified_sections), 1) as avg_score,
-            ROUND(100.0 * COUNTIF(qualified = TRUE) / COUNT(*), 1) as pct_qualified
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date
-        GROUP BY desk
-        ORDER BY avg_score DESC
-        LIMIT 5
-        """
+        query = self._queries["coaching"]
 
-        # Low-signal analysis (criteria prevalence)
-        signal_query = f"""
-        SELECT
-            ROUND(100.0 * COUNTIF(JSON_VALUE(now, '$.qualified') = 'true') / COUNT(*), 1) as pct_now,
-            ROUND(100.0 * COUNTIF(JSON_VALUE(next, '$.qualified') = 'true') / COUNT(*), 1) as pct_next,
-            ROUND(100.0 * COUNTIF(JSON_VALUE(measure, '$.qualified') = 'true') / COUNT(*), 1) as pct_measure,
-            ROUND(100.0 * COUNTIF(JSON_VALUE(blocker, '$.qualified') = 'true') / COUNT(*), 1) as pct_blocker
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date AND qualified = TRUE
-        """
-
-        # Sample meetings for context
-        sample_query = f"""
-        SELECT
-            meeting_id,
-            date,
-            desk,
-            title,
-            total_qualified_sections,
-            now,
-            next,
-            measure,
-            blocker,
-            fit
-        FROM `{self.table_id}`
-        WHERE TIMESTAMP(date) BETWEEN @start_date AND @end_date AND qualified = TRUE
-        ORDER BY total_qualified_sections DESC
-        LIMIT 10
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
-                bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date),
-            ]
-        )
+        job_config = self._job_config(start_date, end_date)
 
         logger.info(
             f"Fetching coaching data: {start_date.isoformat()} to {end_date.isoformat()}"
         )
 
         try:
-            # Execute queries
-            summary_job = self.client.query(summary_query, job_config=job_config)
-            summary_results = list(summary_job.result())
-            summary = dict(summary_results[0].items()) if summary_results else {}
-
-            leaderboard_job = self.client.query(leaderboard_query, job_config=job_config)
-            leaderboard = [dict(row.items()) for row in leaderboard_job.result()]
-
-            signal_job = self.client.query(signal_query, job_config=job_config)
-            signal_results = list(signal_job.result())
-            signal_analysis = dict(signal_results[0].items()) if signal_results else {}
-
-            sample_job = self.client.query(sample_query, job_config=job_config)
-            sample_meetings = []
-            for row in sample_job.result():
-                row_dict = dict(row.items())
-                # Parse JSON fields
-                import json
-                for field in ["now", "next", "measure", "blocker", "fit"]:
-                    if isinstance(row_dict.get(field), str):
-                        try:
-                            row_dict[field] = json.loads(row_dict[field])
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                sample_meetings.append(row_dict)
+            row = next(iter(self.client.query_and_wait(query, job_config=job_config)))
+
+            summary = row["summary"] or {}
+            leaderboard = row["leaderboard"]
+            signal_analysis = row["signal_analysis"] or {}
+            sample_meetings = row["sample_meetings"]
 
             result = {
                 "summary": summary,
@@ -354,11 +421,14 @@ class BigQueryClient:
 
 # Lazy-loaded global instance
 _bq_client = None
+_bq_client_lock = threading.Lock()
 
 
 def get_bq_client() -> BigQueryClient:
     """Get or create BigQuery client instance."""
     global _bq_client
     if _bq_client is None:
-        _bq_client = BigQueryClient()
+        with _bq_client_lock:
+            if _bq_client is None:
+                _bq_client = BigQueryClient()
     return _bq_client
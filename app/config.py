@@ -5,6 +5,16 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+# Settings that must be non-empty for the service to start
+_REQUIRED = (
+    "BQ_PROJECT_ID",
+    "BQ_DATASET",
+    "BQ_TABLE",
+    "OPENAI_API_KEY",
+    "ZAPIER_HOOK_URL",
+)
+
+
 class Config:
     """Application configuration."""
 
@@ -12,10 +22,47 @@ class Config:
     BQ_PROJECT_ID: str = os.getenv("BQ_PROJECT_ID", "")
     BQ_DATASET: str = os.getenv("BQ_DATASET", "")
     BQ_TABLE: str = os.getenv("BQ_TABLE", "")
+    FULL_TABLE_ID: str = f"{BQ_PROJECT_ID}.{BQ_DATASET}.{BQ_TABLE}"
+    # DATE column the table is partitioned on
+    BQ_PARTITION_COLUMN: str = os.getenv("BQ_PARTITION_COLUMN", "date")
+    # Optional fully-qualified table with pre-extracted JSON fields (see AnalyticsClient.refresh_flat_table)
+    BQ_FLAT_TABLE: str = os.getenv("BQ_FLAT_TABLE", "")
+    # Optional fully-qualified materialized view of daily per-host rollups
+    BQ_HOST_DAILY_VIEW: str = os.getenv("BQ_HOST_DAILY_VIEW", "")
+
+    # Seconds to memoize analytics query results (0 disables)
+    ANALYTICS_CACHE_TTL: int = int(os.getenv("ANALYTICS_CACHE_TTL", "300"))
 
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     DEFAULT_LLM_MODEL: str = os.getenv("DEFAULT_LLM_MODEL", "gpt-4o-mini")
+    # Per-section model overrides (empty uses DEFAULT_LLM_MODEL); the structured
+    # coaching section defaults to a small, fast model
+    LLM_MODEL_SUMMARY: str = os.getenv("LLM_MODEL_SUMMARY", "")
+    LLM_MODEL_CARDS: str = os.getenv("LLM_MODEL_CARDS", "")
+    LLM_MODEL_COACHING: str = os.getenv("LLM_MODEL_COACHING", "gpt-4o-mini")
+    # SQLite file caching LLM responses by prompt hash (empty disables)
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "/tmp/unknown_llm_cache.sqlite3")
+    # Seconds a cached LLM response or card stays valid (0 keeps them forever)
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    # Seconds a whole report is reused for structurally unchanged data (0 disables)
+    LLM_REPORT_CACHE_TTL: int = int(os.getenv("LLM_REPORT_CACHE_TTL", str(7 * 24 * 3600)))
+    # Send LLM calls via the OpenAI Batch API, falling back to direct calls after the timeout
+    LLM_BATCH_MODE: bool = os.getenv("LLM_BATCH_MODE", "false").lower() == "true"
+    LLM_BATCH_TIMEOUT: int = int(os.getenv("LLM_BATCH_TIMEOUT", "1800"))
+    # Most meetings analysed per conversation-card LLM call
+    LLM_CARDS_PER_BATCH: int = max(1, int(os.getenv("LLM_CARDS_PER_BATCH", "6")))
+    # Direct LLM calls allowed in flight at once, and seconds before one is abandoned and retried
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_CALL_TIMEOUT: float = float(os.getenv("LLM_CALL_TIMEOUT", "120"))
+    # Requests per minute to pace direct LLM calls under (0 disables pacing)
+    OPENAI_RPM: int = int(os.getenv("OPENAI_RPM", "0"))
+
+    # Seconds a rendered preview page is reused for the same mode and days (0 disables)
+    PREVIEW_CACHE_TTL: int = int(os.getenv("PREVIEW_CACHE_TTL", "300"))
+
+    # Threads available to blocking BigQuery/LLM/render work offloaded from request handlers
+    WORKER_THREADS: int = int(os.getenv("WORKER_THREADS", "64"))
 
     # Zapier
     ZAPIER_HOOK_URL: str = os.getenv("ZAPIER_HOOK_URL", "")
@@ -26,24 +73,22 @@ class Config:
     # Timezone
     TIMEZONE: str = "Europe/London"
 
+    _validated: bool = False
+
     @classmethod
     def validate(cls) -> None:
-        """Validate required environment variables are set."""
-        required = [
-            "BQ_PROJECT_ID",
-            "BQ_DATASET",
-            "BQ_TABLE",
-            "OPENAI_API_KEY",
-            "ZAPIER_HOOK_URL"
-        ]
-        missing = [key for key in required if not getattr(cls, key)]
+        """Validate required environment variables are set (once per process)."""
+        if cls._validated:
+            return
+        missing = [key for key in _REQUIRED if not getattr(cls, key)]
         if missing:
             raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+        cls._validated = True
 
     @classmethod
     def get_full_table_id(cls) -> str:
         """Return fully-qualified BigQuery table ID."""
-        return f"{cls.BQ_PROJECT_ID}.{cls.BQ_DATASET}.{cls.BQ_TABLE}"
+        return cls.FULL_TABLE_ID
 
 
 config = Config()
@@ -1,18 +1,323 @@
 """OpenAI LLM integration for UNKNOWN Brain client intelligence reports."""
-import json
+import hashlib
 import logging
 import asyncio
-from typing import Any, Dict, List, Optional
-from collections import defaultdict
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from openai import OpenAI
+import random
+import re
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from operator import itemgetter
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime
+
+import httpx
+import orjson
+import openai
+from openai import AsyncOpenAI
 
 from app.config import config
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connections to the OpenAI API, sized for the concurrent section calls
+LLM_HTTP_POOL_SIZE = 50
+OPENAI_API_BASE = "https://api.openai.com"
+
+
+class EmptyCompletionError(Exception):
+    """The model returned no text."""
+
+
+class TruncatedCompletionError(Exception):
+    """The model stopped at its output token limit, so its text is incomplete."""
+
+
+class MalformedCompletionError(Exception):
+    """The API answered 2xx with a body we couldn't read text from."""
+
+
+# Errors worth another attempt: rate limits, dropped connections/timeouts (APITimeoutError
+# subclasses APIConnectionError), 5xx, calls over LLM_CALL_TIMEOUT and empty output.
+# Truncated output isn't retried: the same token budget would cut it off again.
+_TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+    EmptyCompletionError,
+)
+
+# Typed SDK errors for raw-call statuses, so retries and callers handle them as SDK errors
+_STATUS_ERRORS = {
+    400: openai.BadRequestError,
+    401: openai.AuthenticationError,
+    403: openai.PermissionDeniedError,
+    404: openai.NotFoundError,
+    409: openai.ConflictError,
+    422: openai.UnprocessableEntityError,
+    429: openai.RateLimitError,
+}
+
+# Total attempts per LLM call (the SDK's own retries are disabled in favour of this)
+LLM_MAX_ATTEMPTS = 5
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds the API asked us to wait before retrying (0 if it didn't say)."""
+    response = getattr(error, "response", None)
+    try:
+        return min(60.0, float(response.headers.get("retry-after", 0))) if response is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _retry_transient(func: Callable) -> Callable:
+    """Retry an async LLM call on transient errors with jittered exponential backoff."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+            try:
+                return await func(*args, **kwargs)
+            except _TRANSIENT_ERRORS as e:
+                if attempt == LLM_MAX_ATTEMPTS:
+                    raise
+                # Honour a 429's Retry-After if it asks for longer than the jittered backoff
+                delay = max(random.uniform(0, min(30.0, 2.0 ** attempt)), _retry_after(e))
+                logger.warning(f"LLM call attempt {attempt} failed ({e!r}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    return wrapper
+
+
+# Seconds to collect concurrent calls into a single Batch API job
+LLM_BATCH_COLLECT_SECONDS = 1.0
+
+
+def _output_text(endpoint: str, result: Dict[str, Any]) -> str:
+    """Pull the generated text out of a raw Responses or Chat Completions body."""
+    if endpoint == "/v1/responses":
+        if result.get("status") == "incomplete":
+            reason = (result.get("incomplete_details") or {}).get("reason")
+            raise TruncatedCompletionError(f"Response incomplete ({reason})")
+        return "".join(
+            part["text"]
+            for item in result["output"] if item["type"] == "message"
+            for part in item["content"] if part["type"] == "output_text"
+        )
+    choice = result["choices"][0]
+    if choice.get("finish_reason") == "length":
+        raise TruncatedCompletionError("Completion stopped at max_tokens")
+    return choice["message"]["content"] or ""
+
+
+class _RequestPacer:
+    """Spaces request starts at least 60/rpm seconds apart to stay under a requests-per-minute limit."""
+
+    def __init__(self, rpm: int):
+        self._interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next_start = 0.0
+
+    async def wait(self) -> None:
+        if not self._interval:
+            return
+        # Reserve the next free start time, then sleep until it (all on one event loop, so no lock)
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+# Values that carry no information in a prompt payload
+_EMPTY_VALUES = (None, "", [], {})
+
+
+def _tabulate(data: Any) -> Any:
+    """
+    Rewrite uniform lists of records as {"columns": [...], "rows": [[...], ...]}.
+
+    Field names then appear once per list instead of once per record, which is
+    most of the repetition in meeting payloads. Columns that are empty in every
+    record carry nothing for the model and are dropped. Irregular data is left
+    as is.
+    """
+    if isinstance(data, dict):
+        return {k: _tabulate(v) for k, v in data.items()}
+    if isinstance(data, list):
+        if len(data) > 1 and all(isinstance(item, dict) for item in data):
+            keys = list(data[0])
+            if all(list(item) == keys for item in data):
+                columns = [k for k in keys if any(item[k] not in _EMPTY_VALUES for item in data)]
+                return {
+                    "columns": columns,
+                    "rows": [[_tabulate(item[k]) for k in columns] for item in data],
+                }
+        return [_tabulate(item) for item in data]
+    return data
+
+
+def _to_json(data: Any) -> str:
+    """Serialize prompt data as compact, tabulated JSON, stringifying unsupported types."""
+    # No indentation: the model doesn't need it and it only adds prompt tokens
+    return orjson.dumps(_tabulate(data), default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+class LLMCache:
+    """Persistent SQLite cache of LLM responses keyed by prompt hash."""
+
+    def __init__(self, path: str, max_age: float = 0):
+        self._lock = threading.Lock()
+        # Seconds a cached response stays valid (0 keeps responses forever)
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, output TEXT NOT NULL, created_at REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if "created_at" not in columns:
+            # Caches written before responses expired; their rows count as already stale
+            self._conn.execute("ALTER TABLE responses ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reports (key TEXT PRIMARY KEY, output TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Hash the parts that determine an LLM response."""
+        # Feed each part to the hash separately rather than building one joined copy
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode())
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a prompt, or None (cache errors count as misses)."""
+        oldest = time.time() - self.max_age if self.max_age > 0 else float("-inf")
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT output FROM responses WHERE key = ? AND created_at > ?", (key, oldest)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            row = None
+        if row:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, output: str) -> None:
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, output, created_at) VALUES (?, ?, ?)",
+                    (key, output, time.time()),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def get_report(self, key: str, max_age: float) -> Optional[str]:
+        """Return a cached full report no older than max_age seconds, or None."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT output FROM reports WHERE key = ? AND created_at > ?", (key, time.time() - max_age)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Report cache read failed: {e}")
+            return None
+        return row[0] if row else None
+
+    def set_report(self, key: str, output: str) -> None:
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO reports (key, output, created_at) VALUES (?, ?, ?)",
+                    (key, output, time.time()),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Report cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Response lookup counts since start-up, for logging the hit rate."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 2) if lookups else 0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Fields that change between runs without changing what the report says
+_VOLATILE_FIELDS = frozenset({"meeting_id", "generated_at", "scored_at"})
+
+
+def _fingerprint(data: Any) -> str:
+    """
+    Canonical JSON of report input for the structural report cache.
+
+    Volatile fields are dropped, dates are rounded to their ISO week and keys
+    are sorted, so reruns over effectively unchanged data share a key.
+    """
+    def normalize(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items() if k not in _VOLATILE_FIELDS}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        if isinstance(value, date):
+            year, week, _ = value.isocalendar()
+            return f"{year}-W{week:02d}"
+        return value
+
+    return orjson.dumps(
+        normalize(data), default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
+# Set per report so section calls can flag that a fallback was used
+_report_degraded: ContextVar[Optional[List[bool]]] = ContextVar("report_degraded", default=None)
+
+
+def _mark_degraded() -> None:
+    flags = _report_degraded.get()
+    if flags is not None:
+        flags.append(True)
+
+
+# Output token budget: roughly what one conversation card takes
+CARD_TOKENS = 600
+
+# Characters of each meeting text field kept in the shared summary/coaching payload
+SUMMARY_TEXT_LIMIT = 400
+
+# Conversation cards are packed into batches up to this many estimated input tokens
+# (prompt included) and config.LLM_CARDS_PER_BATCH meetings
+CARD_BATCH_INPUT_TOKENS = 3000
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token; tiktoken isn't a dependency)."""
+    return len(text) // 4
+
+
+# Bump when prompt templates change so cached responses are not reused
+PROMPT_VERSION = "v2"
+
+# Scoring criteria JSON columns and the flattened evidence key for each
+_JSON_FIELDS = ("now", "next", "measure", "blocker", "fit")
+_EVIDENCE_FIELDS = tuple((field, f"{field}_evidence") for field in _JSON_FIELDS)
+
 # Use GPT-4.1 for better quality
 DEFAULT_MODEL = "gpt-4-1106-preview"  # or whatever GPT-4.1 model name is configured
 
@@ -77,32 +382,13 @@ CRITICAL RULES:
 
 Data: {data}"""
 
-# SECTION 2: TEAM PERFORMANCE TABLE PROMPT
-PERFORMANCE_TABLE_PROMPT = """Create a markdown table showing UNKNOWN team performance this week.
+# SECTION 2: TEAM PERFORMANCE TABLE is built locally by LLMClient._build_performance_table
 
-Format EXACTLY as:
-| Name | Conversation | Score |
-|------|--------------|-------|
-| [Name] | [Client] — [Date] | [X]/5 |
-| | [Client 2] — [Date 2] | [X]/5 |
-| | **Average** | **[X.X]/5** |
-| [Name 2] | [Client] — [Date] | [X]/5 |
-| | **Average** | **[X.X]/5** |
-| **Total: X conversations** | **Team Average** | **[X.X]/5** |
+# SECTION 3: CONVERSATION CARD PROMPT (one batch of meetings per call)
+# The invariant instructions are the system message, identical on every batch call
+CONVERSATION_CARD_SYSTEM_PROMPT = """You are UNKNOWN's analyst. UNKNOWN helps companies hire creative talent and build freelance teams.
 
-CRITICAL RULES:
-1. List ALL conversations for each team member
-2. ALWAYS include an Average row (in bold) after each team member's meetings
-3. Sort team members by highest average score first
-4. Use empty Name cell (|  |) for additional meetings and Average rows
-5. Bold the Average rows and Total row
-
-Data: {data}"""
-
-# SECTION 3: CONVERSATION CARD PROMPT (for batches of 3)
-CONVERSATION_CARD_PROMPT = """You are UNKNOWN's analyst. UNKNOWN helps companies hire creative talent and build freelance teams.
-
-For EACH of these {count} CLIENT meetings, create a detailed analysis card:
+For EACH of the CLIENT meetings in the user message, create a detailed analysis card:
 
 ### [Client Name] with [UNKNOWN Team Member]
 
@@ -131,9 +417,9 @@ CRITICAL RULES:
 6. "What can do better" should be 1-2 tactical improvements specific to THIS client situation
 7. Next Action must include concrete deliverable + deadline + strategic purpose
 8. Focus on actionable coaching that can be applied immediately
-9. Replace "meeting_link_here" with the actual meeting_link from the meeting data
+9. Replace "meeting_link_here" with the actual meeting_link from the meeting data"""
 
-Meetings to analyze:
+CONVERSATION_CARD_PROMPT = """Meetings to analyze:
 {meetings_data}"""
 
 # SECTION 4: TEAM COACHING PROMPT
@@ -159,150 +445,567 @@ CRITICAL: Use **bold** markdown for "What the team is doing well:", "To become w
 
 Data: {data}"""
 
+
+# All static wording goes in the system message, byte-identical on every call, so each
+# section's requests share a cacheable prefix; the user message carries only the data
+def _instructions(template: str) -> str:
+    """A prompt template's instructions, without its trailing data placeholder."""
+    return template.split("Data: {data}")[0].rstrip()
+
+
+TEAM_COACHING_SYSTEM_PROMPT = "Generate coaching insights for UNKNOWN team.\n\n" + _instructions(TEAM_COACHING_PROMPT)
+_CARD_HEAD, _CARD_TAIL = CONVERSATION_CARD_PROMPT.split("{meetings_data}")
+# Static template size, counted once so budgeting only measures the data
+_CARD_STATIC_TOKENS = _estimate_tokens(CONVERSATION_CARD_SYSTEM_PROMPT + _CARD_HEAD + _CARD_TAIL)
+
+# The summary and coaching sections read the same payload, so they are written in one call
+# and split on the coaching header that the coaching instructions already require
+_COACHING_HEADER = "## 🎯 TEAM COACHING"
+SUMMARY_AND_COACHING_SYSTEM_PROMPT = (
+    "You are UNKNOWN's sales analyst for client intelligence.\n\n"
+    "Write TWO sections from the data in the user message, one after the other.\n\n"
+    "=== SECTION A: EXECUTIVE SUMMARY ===\n\n"
+    + _instructions(EXECUTIVE_SUMMARY_PROMPT)
+    + "\n\n=== SECTION B: TEAM COACHING ===\n\n"
+    + _instructions(TEAM_COACHING_PROMPT)
+    + f"\n\nOUTPUT ORDER: write Section A first, then Section B starting with the line \"{_COACHING_HEADER}\". "
+    "Do not print the \"=== SECTION ===\" labels."
+)
+
+
+# Each conversation card ends with a "---" line (rule 0 of the card prompt)
+_CARD_SEPARATOR = re.compile(r"^---[ \t]*$", re.MULTILINE)
+
+
+def _split_cards(content: str, count: int) -> Optional[List[str]]:
+    """Split a batch response into its cards, or None if it doesn't hold exactly `count`."""
+    cards = [card.strip() for card in _CARD_SEPARATOR.split(content)]
+    cards = [card + "\n\n---" for card in cards if card]
+    return cards if len(cards) == count else None
+
+
+# A card opens with "### <client> with <team member>"
+_CARD_HEADING = re.compile(r"^###[ \t]+(.+)$", re.MULTILINE)
+
+
+def _card_is_for(card: str, meeting: Dict[str, Any]) -> bool:
+    """Whether a card's heading names the meeting's client."""
+    heading = _CARD_HEADING.search(card)
+    client = str(meeting.get("client") or "").strip().lower()
+    return bool(heading and client) and heading.group(1).strip().lower().startswith(client)
+
+
+def _criterion_evidence(criterion_data: Any) -> str:
+    """Pull the evidence (or reasoning) text out of one scoring criterion."""
+    # Scoring fields read from STRING columns arrive as JSON text
+    if type(criterion_data) is str:
+        if criterion_data[:1] != "{":
+            return ""
+        try:
+            criterion_data = orjson.loads(criterion_data)
+        except orjson.JSONDecodeError:
+            return ""
+    if type(criterion_data) is dict:
+        return criterion_data.get("evidence", criterion_data.get("reasoning", ""))
+    return ""
+
+
+# Caps on free-text meeting fields, so one oversized row can't blow up a prompt
+EVIDENCE_CHAR_LIMIT = 600
+TITLE_CHAR_LIMIT = 200
+LIST_ITEM_LIMIT = 5
+
+
+def _truncate(text: Any, limit: int) -> Any:
+    """Cut a string to `limit` characters, marking the cut; other values pass through."""
+    if type(text) is str and len(text) > limit:
+        return text[:limit] + "…[truncated]"
+    return text
+
+
+def _project_meeting(meeting: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a BigQuery meeting row to the fields the report prompts use."""
+    get = meeting.get
+
+    # Extract client name
+    client = get("client", "Unknown Client")
+    if not client or client == "Unknown Client":
+        client_info = get("client_info", {})
+        if isinstance(client_info, dict):
+            client = client_info.get("client", "Unknown Client")
+        elif isinstance(client_info, str) and client_info[:1] == "{":
+            # Only object-looking text is parsed, so plain strings never raise
+            try:
+                client = orjson.loads(client_info).get("client", "Unknown Client")
+            except orjson.JSONDecodeError:
+                pass
+
+    projected = {
+        "client": client,
+        # UNKNOWN team member name
+        "team_member": get("owner", get("creator_name", "Unknown")),
+        "date": get("meeting_date", get("date", "")),
+        "score": get("score", get("total_qualified_sections", 0)),
+        "title": _truncate(get("meeting_title", get("title", "Client Meeting")), TITLE_CHAR_LIMIT),
+    }
+    for criterion, key in _EVIDENCE_FIELDS:
+        projected[key] = _truncate(get(key, "") or _criterion_evidence(get(criterion)), EVIDENCE_CHAR_LIMIT)
+    for key in ("challenges", "results"):
+        # ARRAY columns arrive as lists, JSON/STRING columns as text
+        value = get(key, [])
+        projected[key] = value[:LIST_ITEM_LIMIT] if type(value) is list else _truncate(value, EVIDENCE_CHAR_LIMIT)
+    projected["offering"] = get("offering", "")
+    projected["meeting_link"] = get("meeting_link", get("granola_link", "#"))
+    return projected
+
+
+def _request_settings(model: str) -> Tuple[str, Dict[str, Any]]:
+    """Return the endpoint and the request fields that are the same for every call to a model."""
+    if model.startswith("gpt-5"):
+        # GPT-5 models use Responses API
+        return "/v1/responses", {
+            "model": model,
+            "reasoning": {"effort": "none" if model == "gpt-5.1" else "minimal"},
+            "text": {"verbosity": "medium"},
+        }
+    # GPT-4 and earlier use Chat Completions API
+    return "/v1/chat/completions", {"model": model, "temperature": 0.3}
+
+
 class LLMClient:
     """OpenAI LLM client for UNKNOWN Brain client intelligence reports."""
 
     def __init__(self):
-        self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        # Async client so independent sections are requested concurrently; the explicit
+        # pool lets retries and back-to-back section calls reuse TLS connections
+        # HTTP/2 multiplexes the concurrent section calls over a single connection
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_POOL_SIZE,
+                max_keepalive_connections=LLM_HTTP_POOL_SIZE // 2,
+                keepalive_expiry=60,
+            ),
+            timeout=httpx.Timeout(600.0, connect=5.0),
+        )
+        self._auth_headers = {
+            "Authorization": f"Bearer {config.OPENAI_API_KEY}",
+            "Content-Type": "application/json",
+        }
+        # Retries are handled by _retry_transient so they are bounded in one place
+        self.client = AsyncOpenAI(api_key=config.OPENAI_API_KEY, http_client=self._http, max_retries=0)
         self.model = config.DEFAULT_LLM_MODEL or DEFAULT_MODEL
-        self.executor = ThreadPoolExecutor(max_workers=10)  # For concurrent API calls
+        # Route calls through the Batch API (for scheduled, non-interactive runs)
+        self.batch_mode = config.LLM_BATCH_MODE
+        # Caps in-flight direct calls so a large card fan-out doesn't trip rate limits
+        self._call_slots = asyncio.Semaphore(config.LLM_MAX_CONCURRENCY)
+        self._pacer = _RequestPacer(config.OPENAI_RPM)
+        # One queue (and flush task) per endpoint and model, since a batch job holds only one of each
+        self._batch_pending: Dict[Tuple[str, str], List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._batch_flush: Dict[Tuple[str, str], asyncio.Task] = {}
+
+        # Structured sections can run on a cheaper model; unset ones use the default
+        self._section_models = {
+            "summary-coaching": config.LLM_MODEL_SUMMARY or self.model,
+            "team-coaching": config.LLM_MODEL_COACHING or self.model,
+            "conversation-cards": config.LLM_MODEL_CARDS or self.model,
+        }
+        # (endpoint, request template, cache key part) per model, built once
+        self._settings: Dict[str, Tuple[str, Dict[str, Any], str]] = {}
+        for model in {self.model, *self._section_models.values()}:
+            endpoint, template = _request_settings(model)
+            self._settings[model] = (
+                endpoint, template, orjson.dumps(template, option=orjson.OPT_SORT_KEYS).decode()
+            )
+        # Every section's settings, for keying whole reports
+        self._report_settings_key = orjson.dumps(
+            {section: self._settings[model][1] for section, model in self._section_models.items()},
+            option=orjson.OPT_SORT_KEYS,
+        ).decode()
+        self.cache = None
+        if config.LLM_CACHE_PATH:
+            try:
+                self.cache = LLMCache(config.LLM_CACHE_PATH, config.LLM_CACHE_TTL)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache disabled: {e}")
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections and the response cache."""
+        await self._http.aclose()
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
 
-    def generate_insights_v2(self, intelligence_data: Dict[str, Any]) -> str:
+    async def __aenter__(self) -> "LLMClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def agenerate_insights_v2(self, intelligence_data: Dict[str, Any]) -> str:
         """
         Generate complete UNKNOWN Brain report using separate LLM calls per section.
-        
+
         Args:
             intelligence_data: BigQuery data with client meetings and stats
-            
+
         Returns:
             Complete formatted report
         """
-        logger.info(f"Generating UNKNOWN Brain report using {self.model}")
-        
-        # Process data for client meeting context
-        processed_data = self._process_client_meetings(intelligence_data)
-        
-        # Generate each section separately
-        sections = []
-        
-        # 1. Executive Summary
-        logger.info("Generating Executive Summary...")
-        executive_summary = self._generate_executive_summary(processed_data)
-        sections.append(f"## 📊 EXECUTIVE SUMMARY\n\n{executive_summary}")
-        
-        # 2. Team Performance Table
-        logger.info("Generating Team Performance Table...")
-        performance_table = self._generate_performance_table(processed_data)
-        sections.append(f"## 📊 TEAM PERFORMANCE TABLE\n\n{performance_table}")
-        
-        # 3. All Conversations (with concurrent processing)
-        logger.info(f"Generating {len(processed_data['meetings'])} conversation cards...")
-        conversation_cards = self._generate_all_conversations_concurrent(processed_data['meetings'])
-        sections.append(f"## 🎯 ALL CONVERSATIONS (Best to Worst)\n\n{conversation_cards}")
-        
-        # 4. Team Coaching
-        logger.info("Generating Team Coaching...")
-        team_coaching = self._generate_team_coaching(processed_data)
-        sections.append(team_coaching)
-        
-        # Combine all sections
+        key = None
+        if self.cache is not None and config.LLM_REPORT_CACHE_TTL > 0:
+            key = LLMCache.make_key(self._report_settings_key, PROMPT_VERSION, _fingerprint(intelligence_data))
+            cached = self.cache.get_report(key, config.LLM_REPORT_CACHE_TTL)
+            if cached is not None:
+                logger.info("Report cache hit")
+                return cached
+
+        # Collects a flag from any section call that fell back, so degraded reports aren't cached
+        degraded: List[bool] = []
+        token = _report_degraded.set(degraded)
+        try:
+            # Combine all sections
+            sections = [section async for section in self.astream_insights_v2(intelligence_data)]
+        finally:
+            _report_degraded.reset(token)
         full_report = "\n\n".join(sections)
-        
+
+        if key is not None and not degraded:
+            self.cache.set_report(key, full_report)
+        if self.cache is not None:
+            logger.info(f"LLM cache stats: {self.cache.stats()}")
+
         logger.info(f"Complete report generated: {len(full_report)} chars")
         return full_report
-    
-    def _call_llm(self, system_prompt: str, user_prompt: str, max_tokens: int = 500) -> str:
+
+    async def astream_insights_v2(self, intelligence_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Yield the report's sections in order, each as soon as it is ready.
+
+        The sections are independent, so their LLM calls all run concurrently;
+        the first section can be consumed while later ones are still generating.
+        """
+        logger.info(f"Generating UNKNOWN Brain report using {self.model}")
+
+        # Process data for client meeting context
+        processed_data = self._process_client_meetings(intelligence_data)
+
+        # The summary and coaching sections share one payload and one LLM call
+        data_json = _to_json(self._summary_payload(processed_data))
+
+        # Generate each section separately, with all LLM calls in flight at once
+        logger.info(
+            f"Generating Executive Summary, Team Performance Table, "
+            f"{len(processed_data['meetings'])} conversation cards and Team Coaching..."
+        )
+        # The table is pure formatting of numbers already computed, so it's built locally
+        table = self._build_performance_table(processed_data)
+        combined = asyncio.ensure_future(self._generate_summary_and_coaching(processed_data, data_json))
+        cards = asyncio.ensure_future(self._generate_all_conversations_concurrent(processed_data['meetings']))
+        tasks = [combined, cards]
+
+        try:
+            summary, coaching = await combined
+            yield "## 📊 EXECUTIVE SUMMARY\n\n" + summary
+            yield "## 📊 TEAM PERFORMANCE TABLE\n\n" + table
+            yield "## 🎯 ALL CONVERSATIONS (Best to Worst)\n\n" + await cards
+            yield coaching
+        finally:
+            # Don't leave calls running if the consumer stops early
+            for task in tasks:
+                task.cancel()
+
+    async def _call_llm(
+        self, system_prompt: str, user_prompt: str, max_tokens: int = 500, section: Optional[str] = None
+    ) -> str:
+        """Call the LLM, reusing a cached response when the same prompt was seen before."""
+        key = None
+        if self.cache is not None:
+            settings_key = self._settings[self._section_models.get(section, self.model)][2]
+            key = LLMCache.make_key(settings_key, PROMPT_VERSION, max_tokens, system_prompt, user_prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info("LLM cache hit")
+                return cached
+
+        try:
+            output = await self._call_llm_uncached(system_prompt, user_prompt, max_tokens, section)
+        except Exception:
+            _mark_degraded()
+            raise
+
+        if not output:
+            _mark_degraded()
+        elif key is not None:
+            self.cache.set(key, output)
+        return output
+
+    def _request(
+        self, system_prompt: str, user_prompt: str, max_tokens: int, section: Optional[str] = None
+    ) -> tuple[str, Dict[str, Any]]:
+        """Return the API endpoint and request body for a prompt."""
+        endpoint, template, _ = self._settings[self._section_models.get(section, self.model)]
+        if endpoint == "/v1/responses":
+            # The system prompt goes in `instructions`, so no combined string is built
+            body = {
+                **template,
+                "instructions": system_prompt,
+                "input": user_prompt,
+                "max_output_tokens": max_tokens,
+            }
+        else:
+            body = {
+                **template,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "max_tokens": max_tokens,
+            }
+        if section:
+            # Route calls for the same section together so their static prefix stays cached
+            body["prompt_cache_key"] = f"unknown-brain-{section}"
+        return endpoint, body
+
+    async def _call_llm_uncached(
+        self, system_prompt: str, user_prompt: str, max_tokens: int = 500, section: Optional[str] = None
+    ) -> str:
         """Universal LLM caller that handles both Chat Completions and Responses API."""
+        endpoint, body = self._request(system_prompt, user_prompt, max_tokens, section)
+
+        if self.batch_mode:
+            try:
+                return await self._call_llm_batch(endpoint, body)
+            except Exception as e:
+                logger.warning(f"Batch LLM call failed, falling back to a direct call: {e}")
+
         try:
-            # GPT-5 models use Responses API
-            if self.model.startswith("gpt-5"):
-                # Combine system and user prompts for Responses API
-                full_prompt = f"{system_prompt}\n\n{user_prompt}"
-                effort = "none" if self.model == "gpt-5.1" else "minimal"
-
-                response = self.client.responses.create(
-                    model=self.model,
-                    input=full_prompt,
-                    reasoning={"effort": effort},
-                    text={"verbosity": "medium"}
-                )
-                return response.output_text
-            else:
-                # GPT-4 and earlier use Chat Completions API
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    max_tokens=max_tokens,
-                    temperature=0.3
-                )
-                return response.choices[0].message.content
+            return await self._call_llm_direct(endpoint, body)
         except Exception as e:
             logger.error(f"LLM call failed: {e}", exc_info=True)
             raise
 
-    def _generate_executive_summary(self, data: Dict[str, Any]) -> str:
-        """Generate executive summary section."""
+    @_retry_transient
+    async def _call_llm_direct(self, endpoint: str, body: Dict[str, Any]) -> str:
+        """Make one API call and return its text."""
+        # Held per attempt, so calls backing off between retries don't occupy a slot
+        async with self._call_slots:
+            await self._pacer.wait()
+            output = await asyncio.wait_for(self._raw_create(endpoint, body), config.LLM_CALL_TIMEOUT)
+
+        if not output:
+            raise EmptyCompletionError(f"{self.model} returned no text")
+        return output
+
+    async def _raw_create(self, endpoint: str, body: Dict[str, Any]) -> str:
+        """POST the request directly, skipping the SDK's request/response model construction."""
         try:
-            content = self._call_llm(
-                system_prompt="You are UNKNOWN's sales analyst for client intelligence.",
-                user_prompt=EXECUTIVE_SUMMARY_PROMPT.format(
-                    data=json.dumps(data, indent=2, default=str)
-                ),
-                max_tokens=800  # Increased for 6-section format
+            response = await self._http.post(
+                OPENAI_API_BASE + endpoint, content=orjson.dumps(body), headers=self._auth_headers
             )
-            return content or self._fallback_executive_summary(data)
+        except httpx.TimeoutException as e:
+            raise openai.APITimeoutError(request=e.request) from e
+        except httpx.TransportError as e:
+            raise openai.APIConnectionError(message=str(e), request=e.request) from e
+        # Failures surface as the SDK's types: 429/5xx are retried, other 4xx raise straight to the caller
+        status = response.status_code
+        if status >= 400:
+            error = _STATUS_ERRORS.get(status, openai.InternalServerError if status >= 500 else openai.APIStatusError)
+            raise error(f"{endpoint} returned {status}", response=response, body=None)
+        try:
+            return _output_text(endpoint, orjson.loads(response.content))
+        except (orjson.JSONDecodeError, KeyError, IndexError, TypeError) as e:
+            # The call succeeded and was billed, so don't send it again
+            logger.error(f"Unreadable {endpoint} response body: {response.content[:1000]!r}")
+            raise MalformedCompletionError(f"{endpoint} returned an unexpected body: {e!r}") from e
+
+    async def _call_llm_batch(self, endpoint: str, body: Dict[str, Any]) -> str:
+        """
+        Queue one request for the next Batch API job (half price, up to 24h turnaround).
+
+        Calls made within LLM_BATCH_COLLECT_SECONDS of each other, i.e. all of a
+        report's sections and card batches, are submitted together as one job.
+        """
+        group = (endpoint, body["model"])
+        future = asyncio.get_running_loop().create_future()
+        self._batch_pending.setdefault(group, []).append((body, future))
+        flush = self._batch_flush.get(group)
+        if flush is None or flush.done():
+            self._batch_flush[group] = asyncio.ensure_future(self._flush_batch(group))
+        return await future
+
+    async def _flush_batch(self, group: Tuple[str, str]) -> None:
+        """Submit one endpoint/model's queued requests as one batch and resolve each caller's future."""
+        await asyncio.sleep(LLM_BATCH_COLLECT_SECONDS)
+        endpoint = group[0]
+        # Callers that were cancelled while waiting have already-done futures
+        pending = [(body, future) for body, future in self._batch_pending.pop(group, []) if not future.done()]
+        self._batch_flush.pop(group, None)
+        if not pending:
+            return
+
+        try:
+            outputs = await self._run_batch(endpoint, [body for body, _ in pending])
         except Exception as e:
-            logger.error(f"Executive summary generation failed: {e}")
-            return self._fallback_executive_summary(data)
-    
-    def _generate_performance_table(self, data: Dict[str, Any]) -> str:
-        """Generate team performance table."""
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (_, future) in enumerate(pending):
+            if future.done():
+                continue
+            if i in outputs:
+                future.set_result(outputs[i])
+            else:
+                future.set_exception(RuntimeError(f"LLM batch returned no result for request {i}"))
+
+    async def _run_batch(self, endpoint: str, bodies: List[Dict[str, Any]]) -> Dict[int, str]:
+        """
+        Run one Batch API job and return each successful request's text by index.
+
+        Polls with exponential backoff; gives up and cancels the batch after
+        LLM_BATCH_TIMEOUT seconds so the callers can fall back to direct calls.
+        """
+        lines = b"\n".join(
+            orjson.dumps({"custom_id": str(i), "method": "POST", "url": endpoint, "body": body})
+            for i, body in enumerate(bodies)
+        )
+        input_file = await self.client.files.create(file=("requests.jsonl", lines), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id, endpoint=endpoint, completion_window="24h"
+        )
+        logger.info(f"Submitted LLM batch {batch.id} with {len(bodies)} requests")
+
+        deadline = time.monotonic() + config.LLM_BATCH_TIMEOUT
+        delay = 5.0
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if time.monotonic() + delay > deadline:
+                await self.client.batches.cancel(batch.id)
+                raise TimeoutError(f"LLM batch {batch.id} still {batch.status} after {config.LLM_BATCH_TIMEOUT}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+            batch = await self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"LLM batch {batch.id} ended with status {batch.status}")
+
+        output = await self.client.files.content(batch.output_file_id)
+        results: Dict[int, str] = {}
+        for line in output.content.splitlines():
+            if not line:
+                continue
+            try:
+                record = orjson.loads(line)
+                response = record["response"]
+                if response["status_code"] == 200:
+                    results[int(record["custom_id"])] = _output_text(endpoint, response["body"])
+            except TruncatedCompletionError as e:
+                logger.warning(f"Skipping truncated LLM batch result: {e}")
+            except (orjson.JSONDecodeError, KeyError, IndexError, TypeError, ValueError) as e:
+                # The affected caller falls back to a direct call
+                logger.warning(f"Skipping malformed LLM batch result: {e}")
+        return results
+
+    async def _generate_summary_and_coaching(
+        self, data: Dict[str, Any], data_json: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Generate the executive summary and team coaching sections in a single call."""
         try:
-            content = self._call_llm(
-                system_prompt="Create a performance table for UNKNOWN team.",
-                user_prompt=PERFORMANCE_TABLE_PROMPT.format(
-                    data=json.dumps(data['team_performance'], indent=2, default=str)
-                )
+            content = await self._call_llm(
+                system_prompt=SUMMARY_AND_COACHING_SYSTEM_PROMPT,
+                user_prompt="Data: " + (data_json or _to_json(data)),
+                max_tokens=1600,  # Both 800-token sections
+                section="summary-coaching",
             )
-            return content or self._fallback_performance_table(data)
         except Exception as e:
-            logger.error(f"Performance table generation failed: {e}")
-            return self._fallback_performance_table(data)
-    
-    def _generate_all_conversations_concurrent(self, meetings: List[Dict[str, Any]]) -> str:
-        """Generate all conversation cards sequentially (more reliable than concurrent)."""
+            logger.error(f"Summary and coaching generation failed: {e}")
+            return self._fallback_executive_summary(data), self._fallback_team_coaching(data)
+
+        summary, header, coaching = (content or "").partition(_COACHING_HEADER)
+        summary = summary.strip() or self._fallback_executive_summary(data)
+        if not header:
+            # Keep the summary and ask for the coaching section on its own
+            logger.warning("Combined summary/coaching output had no coaching header; generating coaching separately")
+            return summary, await self._generate_team_coaching(data, data_json)
+        return summary, header + coaching
+
+    async def _generate_team_coaching(self, data: Dict[str, Any], data_json: Optional[str] = None) -> str:
+        """Generate team coaching section on its own."""
+        try:
+            content = await self._call_llm(
+                system_prompt=TEAM_COACHING_SYSTEM_PROMPT,
+                user_prompt="Data: " + (data_json or _to_json(data)),
+                max_tokens=800,
+                section="team-coaching",
+            )
+            return content or self._fallback_team_coaching(data)
+        except Exception as e:
+            logger.error(f"Team coaching generation failed: {e}")
+            return self._fallback_team_coaching(data)
+
+    async def _generate_all_conversations_concurrent(self, meetings: List[Dict[str, Any]]) -> str:
+        """Generate all conversation cards, requesting every batch concurrently."""
         if not meetings:
             return "No qualified meetings found."
 
         # Sort meetings by score (best first)
-        meetings_sorted = sorted(meetings, key=lambda x: x.get('score', 0), reverse=True)
-
-        # Process in batches of 3 meetings at a time
-        batch_size = 3
-        batches = [meetings_sorted[i:i+batch_size] for i in range(0, len(meetings_sorted), batch_size)]
+        # Every processed meeting has a score, so a C-level itemgetter can key the sort
+        meetings_sorted = sorted(meetings, key=itemgetter('score'), reverse=True)
+
+        # Reuse cards for meetings whose inputs are unchanged since an earlier run
+        cards: List[Optional[str]] = [None] * len(meetings_sorted)
+        if self.cache is not None:
+            cards = [self.cache.get(self._card_key(meeting)) for meeting in meetings_sorted]
+        pending = [i for i, card in enumerate(cards) if card is None]
+        if len(pending) < len(cards):
+            logger.info(f"Reusing {len(cards) - len(pending)} cached conversation cards")
+
+        # Pack the remaining meetings into as few batches as the budgets allow
+        batches: List[List[int]] = []
+        batch_tokens = 0
+        for i in pending:
+            tokens = _estimate_tokens(_to_json(meetings_sorted[i]))
+            if (
+                not batches
+                or len(batches[-1]) == config.LLM_CARDS_PER_BATCH
+                or batch_tokens + tokens > CARD_BATCH_INPUT_TOKENS
+            ):
+                batches.append([])
+                batch_tokens = _CARD_STATIC_TOKENS
+            batches[-1].append(i)
+            batch_tokens += tokens
+
+        logger.info(
+            f"Generating {len(batches)} batches of conversation cards concurrently "
+            f"(sizes {[len(batch) for batch in batches]}, max {config.LLM_CARDS_PER_BATCH})..."
+        )
+        # gather keeps batch order; a failed batch doesn't cancel its siblings
+        results = await asyncio.gather(
+            *(self._generate_conversation_batch([meetings_sorted[i] for i in batch]) for batch in batches),
+            return_exceptions=True,
+        )
+
+        for batch, content in zip(batches, results):
+            if isinstance(content, BaseException):
+                logger.error(f"Batch generation failed: {content}", exc_info=content)
+                # Generate fallback for THIS specific batch
+                batch_cards = [self._fallback_conversation_card(meetings_sorted[i]) for i in batch]
+            else:
+                # Put each card back in its meeting's slot; an unsplittable batch stays whole
+                batch_cards = _split_cards(content, len(batch)) or [content] + [""] * (len(batch) - 1)
+            for i, card in zip(batch, batch_cards):
+                cards[i] = card
 
-        all_cards = []
+        return "\n".join(card for card in cards if card)
 
-        # Process each batch sequentially
-        for batch in batches:
-            try:
-                logger.info(f"Generating batch of {len(batch)} conversation cards...")
-                cards = self._generate_conversation_batch(batch)
-                all_cards.append(cards)
-            except Exception as e:
-                logger.error(f"Batch generation failed: {e}", exc_info=True)
-                # Generate fallback for THIS specific batch
-                fallback_cards = []
-                for meeting in batch:
-                    fallback_cards.append(self._fallback_conversation_card(meeting))
-                all_cards.append("\n".join(fallback_cards))
+    def _card_key(self, meeting: Dict[str, Any]) -> str:
+        """Cache key for one meeting's card, from its normalized inputs."""
+        canonical = orjson.dumps(meeting, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+        settings_key = self._settings[self._section_models["conversation-cards"]][2]
+        return LLMCache.make_key("card", settings_key, PROMPT_VERSION, canonical.decode())
 
-        return "\n".join(all_cards)
-    
-    def _generate_conversation_batch(self, meetings_batch: List[Dict[str, Any]]) -> str:
+    async def _generate_conversation_batch(self, meetings_batch: List[Dict[str, Any]]) -> str:
         """Generate conversation cards for a batch of meetings."""
         try:
             # Debug: log meeting structure
@@ -310,14 +1013,24 @@ class LLMClient:
             for i, m in enumerate(meetings_batch):
                 logger.info(f"Meeting {i}: client={m.get('client')}, team_member={m.get('team_member')}, has_meeting_link={'meeting_link' in m}")
 
-            content = self._call_llm(
-                system_prompt="You are UNKNOWN's analyst. Create detailed meeting analysis cards.",
-                user_prompt=CONVERSATION_CARD_PROMPT.format(
-                    count=len(meetings_batch),
-                    meetings_data=json.dumps(meetings_batch, indent=2, default=str)
-                ),
-                max_tokens=2000
+            # Size the budget to the batch so short batches don't reserve a full batch's budget
+            max_tokens = 200 + CARD_TOKENS * len(meetings_batch)
+            logger.info(f"Conversation batch budget: {max_tokens} tokens")
+            content = await self._call_llm(
+                system_prompt=CONVERSATION_CARD_SYSTEM_PROMPT,
+                user_prompt=_CARD_HEAD + _to_json(meetings_batch) + _CARD_TAIL,
+                max_tokens=max_tokens,
+                section="conversation-cards",
             )
+            if content and self.cache is not None:
+                # Cache each card on its own so a later run can reuse it in any batch, but only
+                # when every card's heading matches its meeting (the model may reorder or merge them)
+                cards = _split_cards(content, len(meetings_batch)) or []
+                if cards and all(map(_card_is_for, cards, meetings_batch)):
+                    for meeting, card in zip(meetings_batch, cards):
+                        self.cache.set(self._card_key(meeting), card)
+                elif cards:
+                    logger.warning("Conversation cards don't match their meetings, not caching the batch")
             return content or ""
         except Exception as e:
             logger.error(f"Conversation batch generation failed: {e}", exc_info=True)
@@ -331,21 +1044,6 @@ class LLMClient:
                 logger.error(f"Fallback card generation also failed: {fallback_error}", exc_info=True)
                 return f"<!-- Error generating cards for {len(meetings_batch)} meetings -->"
     
-    def _generate_team_coaching(self, data: Dict[str, Any]) -> str:
-        """Generate team coaching section."""
-        try:
-            content = self._call_llm(
-                system_prompt="Generate coaching insights for UNKNOWN team.",
-                user_prompt=TEAM_COACHING_PROMPT.format(
-                    data=json.dumps(data, indent=2, default=str)
-                ),
-                max_tokens=800
-            )
-            return content or self._fallback_team_coaching(data)
-        except Exception as e:
-            logger.error(f"Team coaching generation failed: {e}")
-            return self._fallback_team_coaching(data)
-    
     def _process_client_meetings(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Process BigQuery data into client meeting format."""
         
@@ -353,111 +1051,115 @@ class LLMClient:
 
         logger.info(f"Preprocessing {len(meetings)} meetings from pipeline")
 
-        processed_meetings = []
-        team_stats = defaultdict(lambda: {"meetings": [], "total": 0, "count": 0})
-
-        for meeting in meetings:
-            # Extract client name
-            client = meeting.get("client", "Unknown Client")
-            if not client or client == "Unknown Client":
-                client_info = meeting.get("client_info", {})
-                if isinstance(client_info, dict):
-                    client = client_info.get("client", "Unknown Client")
-                elif isinstance(client_info, str):
-                    try:
-                        client = json.loads(client_info).get("client", "Unknown Client")
-                    except:
-                        pass
-            
-            # Extract UNKNOWN team member name
-            team_member = meeting.get("owner", meeting.get("creator_name", "Unknown"))
-            
-            # Process meeting for client context
-            processed_meeting = {
-                "client": client,
-                "team_member": team_member,
-                "date": meeting.get("meeting_date", meeting.get("date", "")),
-                "score": meeting.get("score", meeting.get("total_qualified_sections", 0)),
-                "title": meeting.get("meeting_title", meeting.get("title", "Client Meeting")),
-                "now_evidence": meeting.get("now_evidence", "") or self._extract_evidence(meeting, "now"),
-                "next_evidence": meeting.get("next_evidence", "") or self._extract_evidence(meeting, "next"),
-                "measure_evidence": meeting.get("measure_evidence", "") or self._extract_evidence(meeting, "measure"),
-                "blocker_evidence": meeting.get("blocker_evidence", "") or self._extract_evidence(meeting, "blocker"),
-                "fit_evidence": meeting.get("fit_evidence", "") or self._extract_evidence(meeting, "fit"),
-                "challenges": meeting.get("challenges", []),
-                "results": meeting.get("results", []),
-                "offering": meeting.get("offering", ""),
-                "meeting_link": meeting.get("meeting_link", meeting.get("granola_link", "#"))
-            }
-            
-            processed_meetings.append(processed_meeting)
-            
+        processed_meetings = [_project_meeting(meeting) for meeting in meetings]
+        team_stats: Dict[str, Dict[str, Any]] = {}
+        total_score = 0
+        qualified_meetings = 0
+
+        # One pass accumulates the per-member and team-wide stats together
+        for processed_meeting in processed_meetings:
+            score = processed_meeting["score"]
+            stats = team_stats.get(processed_meeting["team_member"])
+            if stats is None:
+                stats = team_stats[processed_meeting["team_member"]] = {"meetings": [], "total": 0, "count": 0}
+
             # Update team member stats
-            team_stats[team_member]["meetings"].append({
-                "client": client,
+            stats["meetings"].append({
+                "client": processed_meeting["client"],
                 "date": processed_meeting["date"],
-                "score": processed_meeting["score"]
+                "score": score
             })
-            team_stats[team_member]["total"] += processed_meeting["score"]
-            team_stats[team_member]["count"] += 1
-        
+            stats["total"] += score
+            stats["count"] += 1
+            total_score += score
+            qualified_meetings += score >= 3
+
         # Calculate averages
-        for member in team_stats:
-            if team_stats[member]["count"] > 0:
-                team_stats[member]["average"] = round(
-                    team_stats[member]["total"] / team_stats[member]["count"], 1
-                )
-        
+        for stats in team_stats.values():
+            stats["average"] = round(stats["total"] / stats["count"], 1)
+
         # Calculate team stats
         total_meetings = len(processed_meetings)
-        qualified_meetings = len([m for m in processed_meetings if m.get("score", 0) >= 3])
-        average_score = round(
-            sum(m.get("score", 0) for m in processed_meetings) / total_meetings, 1
-        ) if total_meetings else 0
-        
+        average_score = round(total_score / total_meetings, 1) if total_meetings else 0
+
         return {
             "total_meetings": total_meetings,
             "qualified_meetings": qualified_meetings,
             "average_score": average_score,
-            "team_performance": dict(team_stats),
+            "team_performance": team_stats,
             "meetings": processed_meetings,
             "summary": data.get("summary_metrics", {}),
             "trends": data.get("trends", {}),
             "client_patterns": data.get("client_concentration", {})
         }
     
-    def _extract_evidence(self, meeting: Dict, criterion: str) -> str:
-        """Extract evidence from meeting data."""
-        criterion_data = meeting.get(criterion, {})
-        if isinstance(criterion_data, dict):
-            return criterion_data.get("evidence", criterion_data.get("reasoning", ""))
-        return ""
-    
+    def _summary_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Project processed data down to the fields the summary and coaching prompts use."""
+        return {
+            "total_meetings": data["total_meetings"],
+            "qualified_meetings": data["qualified_meetings"],
+            "average_score": data["average_score"],
+            # Per-member meeting lists repeat what is already in "meetings"
+            "team_performance": {
+                member: {"count": stats["count"], "average": stats.get("average", 0)}
+                for member, stats in data["team_performance"].items()
+            },
+            # The summary reasons across meetings, so long evidence is cut to its opening;
+            # the cards still get each meeting in full
+            "meetings": [
+                {
+                    k: v[:SUMMARY_TEXT_LIMIT] if type(v) is str else v
+                    for k, v in meeting.items() if k != "meeting_link"
+                }
+                for meeting in data["meetings"]
+            ],
+            "summary": data["summary"],
+            "trends": data["trends"],
+            "client_patterns": data["client_patterns"],
+        }
+
     # Fallback methods for when LLM fails
     def _fallback_executive_summary(self, data: Dict[str, Any]) -> str:
         return f"The team delivered {data.get('qualified_meetings', 0)} qualified client meetings this period, maintaining a {data.get('average_score', 0)}/5 average score. Key opportunities identified across technology and creative sectors."
     
-    def _fallback_performance_table(self, data: Dict[str, Any]) -> str:
-        table = "| Name | Meetings | Avg Score |\n|------|----------|----------|\n"
-        for member, stats in data.get('team_performance', {}).items():
-            table += f"| {member} | {stats['count']} | {stats.get('average', 0)}/5 |\n"
-        table += f"| **Total: {data.get('total_meetings', 0)} conversations** | **Team Average** | **{data.get('average_score', 0)}/5** |"
-        return table
+    def _build_performance_table(self, data: Dict[str, Any]) -> str:
+        """
+        Render the team performance markdown table.
+
+        Columns are Name | Conversation | Score. Members are sorted by average score,
+        highest first. Each member gets one "Client — Date" row per conversation,
+        with their name only on the first, then a bold Average row. A bold
+        Total/Team Average row closes the table.
+        """
+        # Collect the rows and join once instead of growing the string per member
+        rows = ["| Name | Conversation | Score |", "|------|--------------|-------|"]
+        members = sorted(
+            data.get('team_performance', {}).items(), key=lambda item: item[1].get('average', 0), reverse=True
+        )
+        for member, stats in members:
+            name = member
+            for meeting in stats['meetings']:
+                rows.append(f"| {name} | {meeting['client']} — {meeting['date']} | {meeting['score']}/5 |")
+                name = ""
+            rows.append(f"| | **Average** | **{stats.get('average', 0):.1f}/5** |")
+        rows.append(f"| **Total: {data.get('total_meetings', 0)} conversations** | **Team Average** | **{data.get('average_score', 0):.1f}/5** |")
+        return "\n".join(rows)
     
     def _fallback_conversation_card(self, meeting: Dict[str, Any]) -> str:
-        link = meeting.get('meeting_link', '#')
-        client = meeting.get('client', 'Unknown')
-        team_member = meeting.get('team_member', 'Unknown')
+        get = meeting.get
+        link = get('meeting_link', '#')
+        client = get('client', 'Unknown')
+        team_member = get('team_member', 'Unknown')
 
-        # Synthesize evidence into flowing sentences
-        now = meeting.get('now_evidence', '')[:150] if meeting.get('now_evidence') else 'Client needs assessment in progress'
-        next_step = meeting.get('next_evidence', '')[:150] if meeting.get('next_evidence') else 'Decision timeline to be confirmed'
-        measure = meeting.get('measure_evidence', '')[:150] if meeting.get('measure_evidence') else 'Success criteria to be defined'
-        blocker = meeting.get('blocker_evidence', '')[:150] if meeting.get('blocker_evidence') else 'No immediate blockers identified'
+        # Synthesize evidence into flowing sentences (the defaults are all under 150 chars)
+        now = (get('now_evidence') or 'Client needs assessment in progress')[:150]
+        next_step = (get('next_evidence') or 'Decision timeline to be confirmed')[:150]
+        measure = (get('measure_evidence') or 'Success criteria to be defined')[:150]
+        blocker = (get('blocker_evidence') or 'No immediate blockers identified')[:150]
 
         return f"""### {client} with {team_member}
 
-**Meeting**: {meeting.get('title', 'Meeting')} - {meeting.get('date', 'Date')} | **Score**: {meeting.get('score', 0)}/5
+**Meeting**: {get('title', 'Meeting')} - {get('date', 'Date')} | **Score**: {get('score', 0)}/5
 
 ✅ **What {team_member} Uncovered:**
 
@@ -488,20 +1190,27 @@ Maintaining consistent client meeting quality with good discovery depth.
 
 **One thing to focus on:**
 Always quantify the commercial impact of not hiring - what revenue or projects are at risk without the right talent?"""
-    
-    def __del__(self):
-        """Cleanup executor on deletion."""
-        if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
 
 
 # Lazy-loaded global instance
 _llm_client = None
+_llm_client_lock = threading.Lock()
 
 
 def get_llm_client() -> LLMClient:
     """Get or create LLM client instance."""
     global _llm_client
     if _llm_client is None:
-        _llm_client = LLMClient()
-    return _llm_client
\ No newline at end of file
+        # Locked so concurrent first calls don't each open their own connection pool
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient()
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    """Close the LLM client's connections if it was created."""
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.aclose()
+        _llm_client = None
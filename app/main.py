@@ -1,18 +1,21 @@
 """FastAPI application for UNKNOWN Brain weekly email service."""
+import asyncio
 import logging
-import uuid
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr
 
 from app.bq import get_bq_client
 from app.config import config
-from app.llm import get_llm_client
+from app.llm import close_llm_client, get_llm_client
 from app.render import get_email_subject, render_email
-from app.sender import get_email_sender
+from app.sender import close_email_sender, get_email_sender
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +24,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Rendered preview HTML keyed by (endpoint, mode, days) -> (expires_at, html)
+PREVIEW_CACHE_SIZE = 32
+_preview_cache: Dict[Tuple[str, str, int], Tuple[float, str]] = {}
+
+
+def _cached_preview(key: Tuple[str, str, int]) -> Optional[str]:
+    """Return a still-valid rendered preview, if any."""
+    entry = _preview_cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del _preview_cache[key]
+        return None
+    return entry[1]
+
+
+def _store_preview(key: Tuple[str, str, int], html: str) -> None:
+    """Remember a rendered preview for PREVIEW_CACHE_TTL seconds."""
+    if config.PREVIEW_CACHE_TTL <= 0:
+        return
+    if len(_preview_cache) >= PREVIEW_CACHE_SIZE:
+        # Evict the entry closest to expiry
+        del _preview_cache[min(_preview_cache, key=lambda k: _preview_cache[k][0])]
+    _preview_cache[key] = (time.monotonic() + config.PREVIEW_CACHE_TTL, html)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -33,9 +61,17 @@ async def lifespan(app: FastAPI):
     except ValueError as e:
         logger.error(f"Configuration validation failed: {e}")
         raise
+    # Blocking BigQuery/render work runs via asyncio.to_thread; size its pool for concurrent reports
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=config.WORKER_THREADS, thread_name_prefix="worker")
+    )
+    # Create the webhook client up front so the first send doesn't pay for setup
+    get_email_sender()
     yield
     # Shutdown
     logger.info("Shutting down UNKNOWN Brain email service")
+    await close_llm_client()
+    await close_email_sender()
 
 
 app = FastAPI(
@@ -51,12 +87,27 @@ class SendEmailRequest(BaseModel):
 
     mode: Literal["insights", "coaching"]
     to: Optional[str] = None  # Comma-separated email addresses
+    wait: bool = False  # Send before responding instead of queueing (202)
+
+
+# Pre-encoded "no data" preview pages
+_NO_QUALIFIED_MEETINGS_HTML = b"<html><body><h1>No qualified meetings found in the specified period</h1></body></html>"
+_NO_MEETINGS_LAST_WEEK_HTML = b"<html><body><h1>No meeting data found in the last 7 days</h1></body></html>"
+_NO_DATA_HTML = b"<html><body><h1>No data found in the specified period</h1></body></html>"
+_NO_MEETING_DATA_HTML = b"<html><body><h1>No meeting data found in the specified period</h1></body></html>"
+
+# Paths served without a request id or access log line
+_UNTRACKED_PATHS = frozenset({"/", "/health"})
 
 
 @app.middleware("http")
 async def add_request_id(request: Request, call_next):
     """Add request_id to all requests for logging."""
-    request_id = str(uuid.uuid4())
+    # Probes hit these constantly; skip the id and the log line
+    if request.url.path in _UNTRACKED_PATHS:
+        return await call_next(request)
+
+    request_id = secrets.token_hex(8)
     request.state.request_id = request_id
 
     # Add to logging context
@@ -85,15 +136,11 @@ async def debug_data(request: Request = None):
 
     try:
         bq_client = get_bq_client()
-        intelligence_data = bq_client.fetch_insights_data_v2(days=40)
+        intelligence_data = await asyncio.to_thread(bq_client.fetch_insights_data_v2, days=40)
 
-        # Only return first 2 items from now_pipeline for inspection
-        if intelligence_data.get("now_pipeline"):
-            intelligence_data["now_pipeline"] = intelligence_data["now_pipeline"][:2]
-
-        # Simplify for readability
+        # Simplify for readability, sampling only the first 2 now_pipeline items
         debug_output = {
-            "now_pipeline_sample": intelligence_data.get("now_pipeline", []),
+            "now_pipeline_sample": intelligence_data.get("now_pipeline", [])[:2],
             "client_concentration_count": len(intelligence_data.get("client_concentration", {}).get("top_clients", [])),
             "summary": intelligence_data.get("summary_metrics", {})
         }
@@ -115,6 +162,7 @@ async def health():
 async def preview_email(
     mode: Literal["insights", "coaching"] = Query(..., description="Email mode"),
     days: Optional[int] = Query(None, description="Number of days to look back"),
+    no_cache: bool = Query(False, description="Bypass the rendered preview cache"),
     request: Request = None,
 ):
     """
@@ -134,34 +182,40 @@ async def preview_email(
         if days is None:
             days = 7  # Weekly reports
 
+        cache_key = ("v1", mode, days)
+        html = None if no_cache else _cached_preview(cache_key)
+        if html is not None:
+            logger.info(f"[{request_id}] Serving cached preview")
+            return HTMLResponse(content=html)
+
         # Fetch data from BigQuery
         if mode == "insights":
             logger.info(f"[{request_id}] Fetching v2 insights data from BigQuery for last {days} days")
-            intelligence_data = bq_client.fetch_insights_data_v2(days=days)
+            intelligence_data = await asyncio.to_thread(bq_client.fetch_insights_data_v2, days=days)
 
             if not intelligence_data.get("summary_metrics"):
                 return HTMLResponse(
-                    content="<html><body><h1>No qualified meetings found in the specified period</h1></body></html>",
+                    content=_NO_QUALIFIED_MEETINGS_HTML,
                     status_code=200,
                 )
 
             # Generate content with LLM
             logger.info(f"[{request_id}] Generating insights content with LLM")
-            markdown_content = llm_client.generate_insights_v2(intelligence_data)
+            markdown_content = await llm_client.agenerate_insights_v2(intelligence_data)
 
         else:  # coaching
             logger.info(f"[{request_id}] Fetching coaching data from BigQuery")
-            coaching_data = bq_client.fetch_coaching_data()
+            coaching_data = await asyncio.to_thread(bq_client.fetch_coaching_data)
 
             if not coaching_data.get("summary"):
                 return HTMLResponse(
-                    content="<html><body><h1>No meeting data found in the last 7 days</h1></body></html>",
+                    content=_NO_MEETINGS_LAST_WEEK_HTML,
                     status_code=200,
                 )
 
             # Generate content with LLM
             logger.info(f"[{request_id}] Generating coaching content with LLM")
-            markdown_content = llm_client.generate_coaching(coaching_data)
+            markdown_content = await asyncio.to_thread(llm_client.generate_coaching, coaching_data)
 
         # Render email HTML
         logger.info(f"[{request_id}] Rendering email HTML")
@@ -171,7 +225,8 @@ async def preview_email(
         else:
             total_meetings = coaching_data.get("summary", {}).get("total_meetings")
 
-        html = render_email(mode, markdown_content, total_meetings, days=days)
+        html = await asyncio.to_thread(render_email, mode, markdown_content, total_meetings, days=days)
+        _store_preview(cache_key, html)
 
         logger.info(f"[{request_id}] Preview generated successfully")
         return HTMLResponse(content=html)
@@ -188,6 +243,7 @@ async def preview_email(
 async def preview_email_v2(
     mode: Literal["insights", "coaching"] = Query(..., description="Email mode"),
     days: Optional[int] = Query(None, description="Number of days to analyze (default: 7 for production, 40 for testing)"),
+    no_cache: bool = Query(False, description="Bypass the rendered preview cache"),
     request: Request = None,
 ):
     """
@@ -207,40 +263,47 @@ async def preview_email_v2(
         if days is None:
             days = 7  # Weekly reports
 
+        cache_key = ("v2", mode, days)
+        html = None if no_cache else _cached_preview(cache_key)
+        if html is not None:
+            logger.info(f"[{request_id}] Serving cached preview")
+            return HTMLResponse(content=html)
+
         # Fetch data from BigQuery
         if mode == "insights":
             logger.info(f"[{request_id}] Fetching v2 insights data from BigQuery for last {days} days")
-            intelligence_data = bq_client.fetch_insights_data_v2(days=days)
+            intelligence_data = await asyncio.to_thread(bq_client.fetch_insights_data_v2, days=days)
 
             if not intelligence_data.get("summary_metrics"):
                 return HTMLResponse(
-                    content="<html><body><h1>No data found in the specified period</h1></body></html>",
+                    content=_NO_DATA_HTML,
                     status_code=200,
                 )
 
             # Generate content with LLM
             logger.info(f"[{request_id}] Generating v2 insights content with LLM")
-            markdown_content = llm_client.generate_insights_v2(intelligence_data)
+            markdown_content = await llm_client.agenerate_insights_v2(intelligence_data)
 
         else:  # coaching
             logger.info(f"[{request_id}] Fetching insights data from BigQuery for last {days} days (coaching uses same format)")
-            intelligence_data = bq_client.fetch_insights_data_v2(days=days)
+            intelligence_data = await asyncio.to_thread(bq_client.fetch_insights_data_v2, days=days)
 
             if not intelligence_data.get("summary_metrics"):
                 return HTMLResponse(
-                    content="<html><body><h1>No meeting data found in the specified period</h1></body></html>",
+                    content=_NO_MEETING_DATA_HTML,
                     status_code=200,
                 )
 
             # Generate content with LLM - coaching now uses same method as insights
             logger.info(f"[{request_id}] Generating client meeting report with LLM")
-            markdown_content = llm_client.generate_insights_v2(intelligence_data)
+            markdown_content = await llm_client.agenerate_insights_v2(intelligence_data)
 
         # Render email HTML
         logger.info(f"[{request_id}] Rendering email HTML")
         total_meetings = intelligence_data.get("summary_metrics", {}).get("total_meetings")
 
-        html = render_email(mode, markdown_content, total_meetings, days=days)
+        html = await asyncio.to_thread(render_email, mode, markdown_content, total_meetings, days=days)
+        _store_preview(cache_key, html)
 
         logger.info(f"[{request_id}] V2 preview generated successfully")
         return HTMLResponse(content=html)
@@ -253,16 +316,106 @@ async def preview_email_v2(
         )
 
 
+@app.get("/email/preview/v2/stream")
+async def preview_report_stream(
+    days: Optional[int] = Query(None, description="Number of days to analyze (default: 7)"),
+    request: Request = None,
+):
+    """
+    Stream the v2 report as markdown, one section at a time.
+
+    Each section is sent as soon as its LLM call finishes, so the first one
+    arrives well before the whole report is ready.
+    """
+    request_id = getattr(request.state, "request_id", "unknown")
+    logger.info(f"[{request_id}] Streaming v2 report")
+
+    days = days or 7
+    try:
+        intelligence_data = await asyncio.to_thread(get_bq_client().fetch_insights_data_v2, days=days)
+    except Exception as e:
+        logger.error(f"[{request_id}] Report data fetch failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch report data: {str(e)}")
+
+    if not intelligence_data.get("summary_metrics"):
+        raise HTTPException(status_code=404, detail=f"No data found in the last {days} days")
+
+    async def sections():
+        first = True
+        async for section in get_llm_client().astream_insights_v2(intelligence_data):
+            yield section if first else "\n\n" + section
+            first = False
+        logger.info(f"[{request_id}] Report stream complete")
+
+    return StreamingResponse(sections(), media_type="text/markdown; charset=utf-8")
+
+
+async def _generate_and_send(mode: str, recipient: str, request_id: str) -> Dict[str, str]:
+    """Fetch data, generate and render the report, and send it via Zapier."""
+    # Get client instances
+    bq_client = get_bq_client()
+    llm_client = get_llm_client()
+    email_sender = get_email_sender()
+
+    # Set time period - 7 days for weekly reports
+    days = 7
+
+    # Fetch data from BigQuery using v2 functions (coaching uses the same format)
+    logger.info(f"[{request_id}] Fetching {mode} data from BigQuery for last {days} days")
+    intelligence_data = await asyncio.to_thread(bq_client.fetch_insights_data_v2, days=days)
+
+    if not intelligence_data.get("summary_metrics"):
+        raise HTTPException(
+            status_code=404,
+            detail=f"No qualified meetings found in the last {days} days",
+        )
+
+    # Generate content with LLM
+    logger.info(f"[{request_id}] Generating {mode} content with LLM using v2")
+    markdown_content = await llm_client.agenerate_insights_v2(intelligence_data)
+    total_meetings = intelligence_data.get("summary_metrics", {}).get("total_meetings")
+
+    # Render email HTML
+    logger.info(f"[{request_id}] Rendering email HTML")
+    html = await asyncio.to_thread(render_email, mode, markdown_content, total_meetings, days=days)
+
+    # Generate subject
+    subject = get_email_subject(mode)
+
+    # Send via Zapier
+    logger.info(f"[{request_id}] Sending email to {recipient}")
+    result = await email_sender.send_email(
+        to=recipient,
+        subject=subject,
+        html=html,
+    )
+
+    logger.info(f"[{request_id}] Email sent successfully")
+    return result
+
+
+async def _send_in_background(mode: str, recipient: str, request_id: str) -> None:
+    """Run a queued send, logging failures since no client is waiting on it."""
+    try:
+        await _generate_and_send(mode, recipient, request_id)
+    except HTTPException as e:
+        logger.warning(f"[{request_id}] Queued email not sent: {e.detail}")
+    except Exception as e:
+        logger.error(f"[{request_id}] Queued email send failed: {e}", exc_info=True)
+
+
 @app.post("/email/send")
 async def send_email(
     body: SendEmailRequest,
+    background_tasks: BackgroundTasks,
     request: Request = None,
 ):
     """
     Generate and send email via Zapier webhook.
 
     Fetches data from BigQuery, generates content with LLM,
-    renders HTML, and sends via Zapier.
+    renders HTML, and sends via Zapier. Returns 202 and does the work after
+    the response unless `wait` is set.
     """
     request_id = getattr(request.state, "request_id", "unknown")
     logger.info(f"[{request_id}] Sending email: mode={body.mode}, to={body.to}")
@@ -275,62 +428,16 @@ async def send_email(
             detail="No recipient specified and INSIGHTS_SEND_TO not configured",
         )
 
-    try:
-        # Get client instances
-        bq_client = get_bq_client()
-        llm_client = get_llm_client()
-        email_sender = get_email_sender()
-
-        # Set time period - 7 days for weekly reports
-        days = 7
-
-        # Fetch data from BigQuery using v2 functions
-        if body.mode == "insights":
-            logger.info(f"[{request_id}] Fetching insights data from BigQuery for last {days} days")
-            intelligence_data = bq_client.fetch_insights_data_v2(days=days)
-
-            if not intelligence_data.get("summary_metrics"):
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"No qualified meetings found in the last {days} days",
-                )
-
-            # Generate content with LLM
-            logger.info(f"[{request_id}] Generating insights content with LLM using v2")
-            markdown_content = llm_client.generate_insights_v2(intelligence_data)
-            total_meetings = intelligence_data.get("summary_metrics", {}).get("total_meetings")
-
-        else:  # coaching
-            logger.info(f"[{request_id}] Fetching insights data from BigQuery for last {days} days (coaching uses same format)")
-            intelligence_data = bq_client.fetch_insights_data_v2(days=days)
-
-            if not intelligence_data.get("summary_metrics"):
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"No meeting data found in the last {days} days",
-                )
-
-            # Generate content with LLM - coaching now uses same method as insights
-            logger.info(f"[{request_id}] Generating client meeting report with LLM")
-            markdown_content = llm_client.generate_insights_v2(intelligence_data)
-            total_meetings = intelligence_data.get("summary_metrics", {}).get("total_meetings")
-
-        # Render email HTML
-        logger.info(f"[{request_id}] Rendering email HTML")
-        html = render_email(body.mode, markdown_content, total_meetings, days=days)
-
-        # Generate subject
-        subject = get_email_subject(body.mode)
-
-        # Send via Zapier
-        logger.info(f"[{request_id}] Sending email to {recipient}")
-        result = await email_sender.send_email(
-            to=recipient,
-            subject=subject,
-            html=html,
+    if not body.wait:
+        background_tasks.add_task(_send_in_background, body.mode, recipient, request_id)
+        logger.info(f"[{request_id}] Email queued for {recipient}")
+        return JSONResponse(
+            content={"status": "queued", "message": f"Email to {recipient} queued", "request_id": request_id},
+            status_code=202,
         )
 
-        logger.info(f"[{request_id}] Email sent successfully")
+    try:
+        result = await _generate_and_send(body.mode, recipient, request_id)
         return JSONResponse(content=result)
 
     except HTTPException:
@@ -344,7 +451,46 @@ async def send_email(
         )
 
 
+@app.post("/analytics/refresh-flat-table")
+async def refresh_flat_table(request: Request = None):
+    """Rebuild the typed flat analytics table (run nightly via Cloud Scheduler)."""
+    request_id = getattr(request.state, "request_id", "unknown")
+    logger.info(f"[{request_id}] Refreshing flat analytics table")
+
+    from app.analytics import get_analytics_client
+
+    if not await asyncio.to_thread(get_analytics_client().refresh_flat_table):
+        raise HTTPException(status_code=502, detail="Flat table refresh failed or BQ_FLAT_TABLE not set")
+
+    return {"status": "ok", "table": config.BQ_FLAT_TABLE}
+
+
+@app.post("/analytics/create-host-daily-view")
+async def create_host_daily_view(request: Request = None):
+    """Create the host_daily materialized view (one-off setup)."""
+    request_id = getattr(request.state, "request_id", "unknown")
+    logger.info(f"[{request_id}] Creating host_daily materialized view")
+
+    from app.analytics import get_analytics_client
+
+    if not await asyncio.to_thread(get_analytics_client().create_host_daily_view):
+        raise HTTPException(status_code=502, detail="View creation failed or BQ_HOST_DAILY_VIEW not set")
+
+    return {"status": "ok", "view": config.BQ_HOST_DAILY_VIEW}
+
+
 if __name__ == "__main__":
+    import os
+
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop and httptools ship with uvicorn[standard]; workers default to one
+    # per core (in-process caches are per worker)
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        loop="uvloop",
+        http="httptools",
+    )
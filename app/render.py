@@ -1,35 +1,90 @@
 """Email rendering: Markdown → HTML and MJML → HTML."""
 import logging
-import subprocess
-from datetime import datetime, timedelta
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
-import markdown
-from jinja2 import Template
+from markdown_it import MarkdownIt
 
 from app.config import config
 
+try:
+    from mjml import mjml2html
+except ImportError:  # mjml-python not installed; emails use the simple HTML template
+    mjml2html = None
+
 logger = logging.getLogger(__name__)
 
 TEMPLATES_DIR = Path(__file__).parent / "email_templates"
 
+# Report timezone, loaded from the tz database once
+_TZ = ZoneInfo(config.TIMEZONE)
+
+# MJML sources keyed by mode, read once at import
+_MJML_TEMPLATES = {path.stem: path.read_text() for path in TEMPLATES_DIR.glob("*.mjml")}
+
+# markdown_to_html clean-up patterns, compiled once
+_RE_BOLD_TABLE_HEADER = re.compile(r'\*\*##\s*TEAM PERFORMANCE TABLE\*\*')
+_RE_TABLE_HEADER_BOLD = re.compile(r'##\s*\*\*Team Performance Table\*\*')
+_RE_CONVERSATIONS_TEXT = re.compile(r'^🎯\s*ALL CONVERSATIONS.*?\n', re.MULTILINE)
+_RE_FIRST_H3 = re.compile(r'(###)')
+_RE_BOLD_H3 = re.compile(r'###\s*\*\*(.*?)\*\*')
+
+# CommonMark plus GFM tables/strikethrough; "breaks" renders single newlines as <br>
+# like the old nl2br extension. Rendering keeps no state, so one parser serves all threads.
+_MARKDOWN = MarkdownIt("commonmark", {"html": True, "breaks": True}).enable(["table", "strikethrough"])
+
+
+# Card markup for each client section (heading, content)
+_CARD_TEMPLATE = '''<div class="insight-card">
+    <h3 style="color: #0066cc; margin-top: 0;">%s</h3>
+    <div style="padding-left: 10px;">
+        %s
+    </div>
+</div>'''
+
+
+def _wrap_client_cards(html: str) -> str:
+    """Wrap each <h3> and the content up to the next <h3>/<h2> in a card div."""
+    parts = html.split("<h3>")
+    out = [parts[0]]
+    last = len(parts) - 1
+    for index, part in enumerate(parts[1:], 1):
+        client_name, sep, rest = part.partition("</h3>")
+        if not sep:  # unclosed heading, leave as-is
+            out.append("<h3>" + part)
+            continue
+        h2 = rest.find("<h2>")
+        if h2 >= 0:
+            content, tail = rest[:h2], rest[h2:]
+        elif index == last and rest.endswith("\n"):  # keep the document's trailing newline outside the card
+            content, tail = rest[:-1], "\n"
+        else:
+            content, tail = rest, ""
+        out.append(_CARD_TEMPLATE % (client_name.strip(), content.strip()))
+        out.append(tail)
+    return "".join(out)
+
 
 def markdown_to_html(md_content: str) -> str:
     """Convert Markdown to HTML with enhanced formatting for meeting cards."""
-    import re
-
-    # Log the first 500 chars of input to debug
-    logger.info(f"Converting markdown, first 500 chars: {md_content[:500]}")
+    # Log the first 500 chars of input to debug (lazy %s, so nothing is formatted at INFO)
+    logger.debug("Converting markdown, first 500 chars: %s", md_content[:500])
 
     # Remove any LLM-generated headers and replace with proper markdown headers
     # Clean up duplicate "Team Performance Table" text
-    md_content = re.sub(r'\*\*##\s*TEAM PERFORMANCE TABLE\*\*', '', md_content)
-    md_content = re.sub(r'##\s*\*\*Team Performance Table\*\*', '', md_content)
+    # Each fix-up only runs when its literal text is present (cheap substring checks)
+    if "TEAM PERFORMANCE TABLE**" in md_content:
+        md_content = _RE_BOLD_TABLE_HEADER.sub('', md_content)
+    if "Team Performance Table**" in md_content:
+        md_content = _RE_TABLE_HEADER_BOLD.sub('', md_content)
 
     # Convert plain text headers to proper markdown H2
     # Fix "🎯 ALL CONVERSATIONS (Best to Worst)" if LLM outputs it as plain text
-    md_content = re.sub(r'^🎯\s*ALL CONVERSATIONS.*?\n', r'## 🎯 ALL CONVERSATIONS (Best to Worst)\n\n', md_content, flags=re.MULTILINE)
+    if "🎯" in md_content:
+        md_content = _RE_CONVERSATIONS_TEXT.sub(r'## 🎯 ALL CONVERSATIONS (Best to Worst)\n\n', md_content)
 
     # Add section headers if LLM didn't include them
     # Look for table or "ALL CONVERSATIONS" section
@@ -39,38 +94,22 @@ def markdown_to_html(md_content: str) -> str:
 
     if "🎯 ALL CONVERSATIONS" not in md_content and "###" in md_content:
         # Add conversations header before first H3
-        md_content = re.sub(r'(###)', r'## 🎯 ALL CONVERSATIONS (Best to Worst)\n\n\1', md_content, count=1)
+        md_content = _RE_FIRST_H3.sub(r'## 🎯 ALL CONVERSATIONS (Best to Worst)\n\n\1', md_content, count=1)
 
     # Clean up H3 headers wrapped in bold - remove ** around the entire H3 line
-    md_content = re.sub(r'###\s*\*\*(.*?)\*\*', r'### \1', md_content)
+    if "###" in md_content:
+        md_content = _RE_BOLD_H3.sub(r'### \1', md_content)
 
-    # Convert markdown to HTML first with more extensions
-    html = markdown.markdown(
-        md_content,
-        extensions=["extra", "nl2br", "sane_lists", "tables", "fenced_code", "attr_list"],
-    )
+    # Convert markdown to HTML first
+    html = _MARKDOWN.render(md_content)
 
     # Log the first 500 chars of HTML to see if conversion worked
-    logger.info(f"After markdown conversion, first 500 chars: {html[:500]}")
+    logger.debug("After markdown conversion, first 500 chars: %s", html[:500])
 
     # Enhanced styling for client meeting cards
     # Pattern: <h3>Client Name</h3> followed by meeting details
-    pattern = r'<h3>(.*?)</h3>(.*?)(?=<h3>|<h2>|$)'
-
-    def replace_with_card(match):
-        client_name = match.group(1).strip()
-        content = match.group(2).strip()
-
-        # Add card styling for client sections
-        return f'''<div class="insight-card">
-    <h3 style="color: #0066cc; margin-top: 0;">{client_name}</h3>
-    <div style="padding-left: 10px;">
-        {content}
-    </div>
-</div>'''
-
-    # Apply card styling to h3 sections (client cards)
-    html = re.sub(pattern, replace_with_card, html, flags=re.DOTALL)
+    if "<h3>" in html:
+        html = _wrap_client_cards(html)
 
     # Don't override strong styles - let CSS handle it
     # Remove inline styles that might interfere with CSS
@@ -80,13 +119,17 @@ def markdown_to_html(md_content: str) -> str:
 
 def get_week_ending_date() -> str:
     """Get Friday of current week in DD MMM format (Europe/London)."""
-    tz = ZoneInfo(config.TIMEZONE)
-    now = datetime.now(tz)
+    return _week_ending_for(datetime.now(_TZ).date())
+
+
+@lru_cache(maxsize=1)
+def _week_ending_for(today: date) -> str:
+    """Week-ending Friday for a given day; memoized since it only changes daily."""
     # Calculate days until Friday (weekday 4)
-    days_ahead = 4 - now.weekday()
+    days_ahead = 4 - today.weekday()
     if days_ahead < 0:  # Already past Friday
         days_ahead += 7
-    friday = now + timedelta(days=days_ahead)
+    friday = today + timedelta(days=days_ahead)
     return friday.strftime("%d %b")
 
 
@@ -94,44 +137,34 @@ def render_mjml_to_html(mjml_path: Path, content_html: str, total_meetings: int
     """
     Render MJML template to HTML.
 
-    Uses npx mjml to convert MJML to HTML.
+    Uses mjml-python to convert MJML to HTML in-process.
     Falls back to simple HTML template if mjml is not available.
     """
     try:
-        # Read MJML template
-        mjml_template = mjml_path.read_text()
+        # Cached MJML source (read from disk only for templates added after import)
+        mjml_template = _MJML_TEMPLATES.get(mjml_path.stem) or mjml_path.read_text()
 
         # Calculate date range
-        from datetime import datetime, timedelta
-        from zoneinfo import ZoneInfo
-        tz = ZoneInfo(config.TIMEZONE)
-        end_date = datetime.now(tz)
+        end_date = datetime.now(_TZ)
         start_date = end_date - timedelta(days=days)
         date_range = f"{start_date.strftime('%d %b')} - {end_date.strftime('%d %b %Y')}"
 
-        # Replace placeholders
-        mjml_with_content = mjml_template.replace("{{ content }}", content_html)
-        mjml_with_content = mjml_with_content.replace("{{ current_date }}", end_date.strftime("%d %b %Y"))
+        # Replace the small placeholders first so the content is only scanned once
+        mjml_with_content = mjml_template.replace("{{ current_date }}", end_date.strftime("%d %b %Y"))
         mjml_with_content = mjml_with_content.replace("{{ date_range }}", date_range)
         mjml_with_content = mjml_with_content.replace("{{ total_meetings }}", str(total_meetings or "N/A"))
+        mjml_with_content = mjml_with_content.replace("{{ content }}", content_html)
 
-        # Try to use npx mjml
-        try:
-            result = subprocess.run(
-                ["npx", "mjml", "-s"],
-                input=mjml_with_content.encode(),
-                capture_output=True,
-                timeout=10,
-            )
-
-            if result.returncode == 0:
+        # Compile in-process with mjml-python (no Node subprocess per render)
+        if mjml2html is not None:
+            try:
+                html = mjml2html(mjml_with_content)
                 logger.info(f"Successfully rendered MJML template: {mjml_path.name}")
-                return result.stdout.decode()
-            else:
-                logger.warning(f"MJML rendering failed, falling back to simple HTML: {result.stderr.decode()}")
-
-        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-            logger.warning(f"MJML tool not available ({e}), falling back to simple HTML")
+                return html
+            except Exception as e:
+                logger.warning(f"MJML rendering failed, falling back to simple HTML: {e}")
+        else:
+            logger.warning("mjml-python not installed, falling back to simple HTML")
 
     except Exception as e:
         logger.error(f"Error reading MJML template: {e}")
@@ -142,9 +175,6 @@ def render_mjml_to_html(mjml_path: Path, content_html: str, total_meetings: int
 
 def _render_simple_html(content_html: str, mode: str, total_meetings: int = None, days: int = 7) -> str:
     """Simple HTML fallback template."""
-    from datetime import datetime, timedelta
-    from zoneinfo import ZoneInfo
-
     title_map = {
         "insights": "Weekly Insights Report",
         "coaching": "Weekly Team Performance Report",
@@ -152,13 +182,21 @@ def _render_simple_html(content_html: str, mode: str, total_meetings: int = None
     subtitle = title_map.get(mode, "Weekly Update")
 
     # Calculate date range
-    tz = ZoneInfo(config.TIMEZONE)
-    end_date = datetime.now(tz)
+    end_date = datetime.now(_TZ)
     start_date = end_date - timedelta(days=days)
     date_range = f"{start_date.strftime('%d %b')} - {end_date.strftime('%d %b %Y')}"
     current_date = end_date.strftime("%d %b %Y")
 
-    template = """<!DOCTYPE html>
+    head = _SIMPLE_HTML_HEAD.replace("{{ subtitle }}", subtitle).replace("{{ current_date }}", current_date)
+    tail = _SIMPLE_HTML_TAIL.replace("{{ date_range }}", date_range).replace(
+        "{{ total_meetings }}", str(total_meetings or "N/A")
+    )
+    return head + content_html + tail
+
+
+# Used when MJML is unavailable or fails; split around the content so each
+# render only substitutes a few short values into the static halves
+_SIMPLE_HTML_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -319,15 +357,7 @@ def _render_simple_html(content_html: str, mode: str, total_meetings: int = None
     </div>
 </body>
 </html>"""
-
-    tmpl = Template(template)
-    return tmpl.render(
-        content=content_html,
-        subtitle=subtitle,
-        current_date=current_date,
-        date_range=date_range,
-        total_meetings=str(total_meetings or "N/A")
-    )
+_SIMPLE_HTML_HEAD, _SIMPLE_HTML_TAIL = _SIMPLE_HTML_TEMPLATE.split("{{ content }}")
 
 
 def render_email(mode: str, markdown_content: str, total_meetings: int = None, days: int = 7) -> str:
@@ -350,7 +380,7 @@ def render_email(mode: str, markdown_content: str, total_meetings: int = None, d
     mjml_filename = f"{mode}.mjml"
     mjml_path = TEMPLATES_DIR / mjml_filename
 
-    if not mjml_path.exists():
+    if mode not in _MJML_TEMPLATES and not mjml_path.exists():
         logger.warning(f"Template not found: {mjml_path}, using fallback")
         return _render_simple_html(content_html, mode, total_meetings, days)
 
@@ -360,7 +390,14 @@ def render_email(mode: str, markdown_content: str, total_meetings: int = None, d
 
 def get_email_subject(mode: str) -> str:
     """Generate email subject line with week-ending date."""
-    week_ending = get_week_ending_date()
+    return _subject_for(mode, datetime.now(_TZ).date())
+
+
+# Keyed by day rather than ISO week: weekends already roll over to next Friday
+@lru_cache(maxsize=4)
+def _subject_for(mode: str, today: date) -> str:
+    """Subject line for a mode on a given day."""
+    week_ending = _week_ending_for(today)
 
     if mode == "insights":
         return f"UNKNOWN Brain — Weekly Team Performance (w/e {week_ending})"
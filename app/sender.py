@@ -3,6 +3,7 @@ import logging
 from typing import Dict
 
 import httpx
+import orjson
 
 from app.config import config
 
@@ -15,6 +16,16 @@ class EmailSender:
     def __init__(self):
         self.hook_url = config.ZAPIER_HOOK_URL
         self.timeout = 30.0
+        # One pooled client so sends reuse a warm TLS connection to Zapier
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            http2=True,
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        await self._client.aclose()
 
     async def send_email(
         self,
@@ -45,18 +56,19 @@ class EmailSender:
         logger.info(f"Sending email to {to} via Zapier webhook")
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.hook_url,
-                    json=payload,
-                )
-                response.raise_for_status()
-
-                logger.info(f"Email sent successfully to {to}: {response.status_code}")
-                return {
-                    "status": "sent",
-                    "message": f"Email sent to {to}",
-                }
+            # orjson encodes the large HTML body much faster than httpx's stdlib json
+            response = await self._client.post(
+                self.hook_url,
+                content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+            )
+            response.raise_for_status()
+
+            logger.info(f"Email sent successfully to {to}: {response.status_code}")
+            return {
+                "status": "sent",
+                "message": f"Email sent to {to}",
+            }
 
         except httpx.HTTPStatusError as e:
             logger.error(
@@ -84,3 +96,11 @@ def get_email_sender() -> EmailSender:
     if _email_sender is None:
         _email_sender = EmailSender()
     return _email_sender
+
+
+async def close_email_sender() -> None:
+    """Close the email sender's connections if it was created."""
+    global _email_sender
+    if _email_sender is not None:
+        await _email_sender.aclose()
+        _email_sender = None
@@ -1,13 +1,124 @@
 """Test different OpenAI models for email generation and compare costs."""
+import asyncio
 import os
 import json
+import random
+import time
 from datetime import datetime
-from openai import OpenAI
+from functools import wraps
+from pathlib import Path
+import httpx
+import openai
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from app.config import config
+from app.llm import LLMCache
+
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# HTTP/2 so the concurrent model calls share one multiplexed connection.
+# SDK retries are off; with_retries backs off on 429/5xx/timeouts and honours Retry-After
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        timeout=httpx.Timeout(600.0, connect=5.0),
+    ),
+    max_retries=0,
+)
+
+# Seconds between request starts, to stay under OPENAI_RPM like the service does (0 disables)
+REQUEST_INTERVAL = 60.0 / config.OPENAI_RPM if config.OPENAI_RPM > 0 else 0.0
+_next_start = 0.0
+
+# Rate limits, dropped connections/timeouts and 5xx are worth another attempt
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+MAX_ATTEMPTS = 5
+
+
+async def pace():
+    """Wait for the next free request start under REQUEST_INTERVAL."""
+    global _next_start
+    now = time.monotonic()
+    start = max(now, _next_start)
+    _next_start = start + REQUEST_INTERVAL
+    if start > now:
+        await asyncio.sleep(start - now)
+
+
+async def with_retries(call):
+    """Run call() (one API request) paced, retrying transient errors with jittered backoff."""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        await pace()
+        try:
+            return await call()
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            response = getattr(e, "response", None)
+            try:
+                retry_after = min(60.0, float(response.headers.get("retry-after", 0))) if response is not None else 0.0
+            except (TypeError, ValueError):
+                retry_after = 0.0
+            delay = max(random.uniform(0, min(30.0, 2.0 ** attempt)), retry_after)
+            print(f"⏳ Attempt {attempt} failed ({e!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+# UNKNOWN_CACHE=1 replays identical requests from disk (leave unset to measure real cost/latency)
+cache = LLMCache(os.getenv("TEST_MODELS_CACHE_PATH", ".test_models_cache.sqlite3")) if os.getenv("UNKNOWN_CACHE") == "1" else None
+
+
+def cached_result(*parts) -> tuple:
+    """Return (cache key, cached result or None) for a model request."""
+    if cache is None:
+        return None, None
+    key = LLMCache.make_key(*parts)
+    output = cache.get(key)
+    return key, (dict(json.loads(output), cached=True) if output else None)
+
+
+def store_result(key, result: dict) -> dict:
+    """Save a fresh result under its cache key (no-op when caching is off), then spill its output."""
+    if key is not None:
+        cache.set(key, json.dumps(result))
+    return spill_output(result)
+
+
+# Model outputs are written here and only their paths kept in memory
+OUTPUT_DIR = Path(os.getenv("TEST_MODELS_OUTPUT_DIR", "outputs"))
+
+
+def spill_output(result: dict) -> dict:
+    """Write a result's generated text to OUTPUT_DIR/<model>.md and return the result without it."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    path = OUTPUT_DIR / f"{result['model']}.md"
+    path.write_text(result["content"])
+    summary = {k: v for k, v in result.items() if k != "content"}
+    summary["content_path"] = str(path)
+    return summary
+
+
+# Identical requests already in flight this run, keyed by (test, arguments)
+_inflight = {}
+
+
+def coalesce(func):
+    """Share one in-flight API call between concurrent identical test calls."""
+    @wraps(func)
+    async def wrapper(*args):
+        key = (func.__name__, args)
+        if key not in _inflight:
+            task = _inflight[key] = asyncio.ensure_future(func(*args))
+            # Forget the call once it finishes, not when its first caller stops waiting
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+        # Shielded so one caller being cancelled doesn't cancel the call for the others
+        return await asyncio.shield(_inflight[key])
+
+    return wrapper
+
 
 # Pricing per 1M tokens (as of latest pricing)
 PRICING = {
@@ -16,10 +127,35 @@ PRICING = {
     "gpt-5-mini": {"input": 3.00, "output": 12.00},  # Estimated GPT-5-mini pricing
 }
 
-# Sample meeting data (condensed from real data)
-SAMPLE_PROMPT = """You are UNKNOWN's analyst. Create an executive summary for this week's client meetings.
+# (input, output) cost per token, computed once
+COST = {model: (p["input"] / 1_000_000, p["output"] / 1_000_000) for model, p in PRICING.items()}
+
+# Served model names priced under a different PRICING key
+MODEL_ALIASES = {"gpt-4-turbo-2024-04-09": "gpt-4.1"}
+
+
+def pricing_key(served_model: str, requested: str) -> str:
+    """PRICING key for the model the API reports it served (dated snapshots match their base name)."""
+    name = MODEL_ALIASES.get(served_model, served_model)
+    if name in COST:
+        return name
+    matches = [key for key in COST if name.startswith(key + "-")]
+    if matches:
+        return max(matches, key=len)
+    return MODEL_ALIASES.get(requested, requested)
 
-Data:
+
+# Static instructions go first (system/instructions) so providers can reuse the cached prefix;
+# only the weekly data below changes between runs
+SYSTEM_PROMPT = """You are UNKNOWN's internal analyst. Create an executive summary for this week's client meetings.
+
+Write a concise 2-3 paragraph executive summary highlighting:
+- Overall performance metrics
+- Top performer and their key achievement
+- Main hiring trends observed"""
+
+# Sample meeting data (condensed from real data)
+SAMPLE_PROMPT = """Data:
 - 4 qualified client meetings
 - Average score: 4.8/5
 - Team: Sam (3 meetings), Ellie (1 meeting)
@@ -28,50 +164,76 @@ Key meetings:
 1. Footballco - Studio acquisition search (Sam, Score: 5)
 2. Instacart - Freelance-to-perm hiring (Ellie, Score: 5)
 3. Crispin - Creative agency talent search (Sam, Score: 5)
-4. We Are Social US - Senior hire discussion (Sam, Score: 4)
-
-Write a concise 2-3 paragraph executive summary highlighting:
-- Overall performance metrics
-- Top performer and their key achievement
-- Main hiring trends observed"""
+4. We Are Social US - Senior hire discussion (Sam, Score: 4)"""
 
 
-def test_gpt4_chat(prompt: str) -> dict:
+@coalesce
+async def test_gpt4_chat(prompt: str) -> dict:
     """Test GPT-4.1 using Chat Completions API."""
     print("\n" + "="*60)
     print("Testing GPT-4.1 (Chat Completions API)")
     print("="*60)
 
-    response = client.chat.completions.create(
-        model="gpt-4-turbo-2024-04-09",  # GPT-4.1 equivalent
-        messages=[
-            {"role": "system", "content": "You are UNKNOWN's internal analyst."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.3
-    )
-
-    content = response.choices[0].message.content
-    input_tokens = response.usage.prompt_tokens
-    output_tokens = response.usage.completion_tokens
-
-    input_cost = (input_tokens / 1_000_000) * PRICING["gpt-4.1"]["input"]
-    output_cost = (output_tokens / 1_000_000) * PRICING["gpt-4.1"]["output"]
+    key, cached = cached_result("gpt-4-turbo-2024-04-09", SYSTEM_PROMPT, prompt, 0.3)
+    if cached:
+        return spill_output(cached)
+
+    # Stream so time-to-first-token is measured; usage arrives in the final chunk
+    async def call():
+        started = time.perf_counter()
+        ttft = None
+        parts = []
+        usage = None
+        served_model = None
+        stream = await client.chat.completions.create(
+            model="gpt-4-turbo-2024-04-09",  # GPT-4.1 equivalent
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            served_model = served_model or chunk.model
+            if chunk.choices and chunk.choices[0].delta.content:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                parts.append(chunk.choices[0].delta.content)
+            if chunk.usage:
+                usage = chunk.usage
+        return "".join(parts), usage, served_model, ttft, time.perf_counter() - started
+
+    content, usage, served_model, ttft, latency = await with_retries(call)
+    input_tokens = usage.prompt_tokens
+    output_tokens = usage.completion_tokens
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+
+    model_key = pricing_key(served_model or "gpt-4-turbo-2024-04-09", "gpt-4-turbo-2024-04-09")
+    input_rate, output_rate = COST[model_key]
+    input_cost = input_tokens * input_rate
+    output_cost = output_tokens * output_rate
     total_cost = input_cost + output_cost
 
-    return {
-        "model": "gpt-4.1",
+    return store_result(key, {
+        "model": model_key,
         "content": content,
         "input_tokens": input_tokens,
         "output_tokens": output_tokens,
+        "cached_tokens": cached_tokens,
         "total_tokens": input_tokens + output_tokens,
         "input_cost": input_cost,
         "output_cost": output_cost,
-        "total_cost": total_cost
-    }
+        "total_cost": total_cost,
+        "ttft": ttft,
+        "latency": latency,
+    })
 
 
-def test_gpt5_responses(model: str, prompt: str) -> dict:
+@coalesce
+async def test_gpt5_responses(model: str, prompt: str) -> dict:
     """Test GPT-5 models using Responses API."""
     print("\n" + "="*60)
     print(f"Testing {model} (Responses API)")
@@ -80,103 +242,116 @@ def test_gpt5_responses(model: str, prompt: str) -> dict:
     # GPT-5.1 supports "none", but GPT-5-mini needs "minimal"
     effort = "none" if model == "gpt-5.1" else "minimal"
 
-    response = client.responses.create(
-        model=model,
-        input=prompt,
-        reasoning={"effort": effort},
-        text={"verbosity": "medium"}
-    )
-
-    content = response.output_text
+    key, cached = cached_result(model, SYSTEM_PROMPT, prompt, effort, "medium")
+    if cached:
+        return spill_output(cached)
+
+    # Stream so time-to-first-token is measured; usage comes from the final response
+    async def call():
+        started = time.perf_counter()
+        ttft = None
+        parts = []
+        async with client.responses.stream(
+            model=model,
+            instructions=SYSTEM_PROMPT,
+            input=prompt,
+            reasoning={"effort": effort},
+            text={"verbosity": "medium"}
+        ) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta" and event.delta:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    parts.append(event.delta)
+            response = await stream.get_final_response()
+        return "".join(parts), response, ttft, time.perf_counter() - started
+
+    content, response, ttft, latency = await with_retries(call)
     input_tokens = response.usage.input_tokens
     output_tokens = response.usage.output_tokens
+    details = getattr(response.usage, "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
 
-    model_key = model
-    input_cost = (input_tokens / 1_000_000) * PRICING[model_key]["input"]
-    output_cost = (output_tokens / 1_000_000) * PRICING[model_key]["output"]
+    model_key = pricing_key(response.model or model, model)
+    input_rate, output_rate = COST[model_key]
+    input_cost = input_tokens * input_rate
+    output_cost = output_tokens * output_rate
     total_cost = input_cost + output_cost
 
-    return {
-        "model": model,
+    return store_result(key, {
+        "model": model_key,
         "content": content,
         "input_tokens": input_tokens,
         "output_tokens": output_tokens,
+        "cached_tokens": cached_tokens,
         "total_tokens": input_tokens + output_tokens,
         "input_cost": input_cost,
         "output_cost": output_cost,
-        "total_cost": total_cost
-    }
+        "total_cost": total_cost,
+        "ttft": ttft,
+        "latency": latency,
+    })
 
 
 def print_results(result: dict):
-    """Print formatted results."""
-    print(f"\n📊 Model: {result['model']}")
-    print(f"📝 Tokens: {result['input_tokens']:,} in / {result['output_tokens']:,} out = {result['total_tokens']:,} total")
-    print(f"💰 Cost: ${result['input_cost']:.6f} in + ${result['output_cost']:.6f} out = ${result['total_cost']:.6f} total")
-    print(f"\n📄 Output:\n{result['content']}")
+    """Print formatted results (one write per model)."""
+    lines = [
+        f"\n📊 Model: {result['model']}",
+        f"📝 Tokens: {result['input_tokens']:,} in ({result.get('cached_tokens', 0):,} cached) / {result['output_tokens']:,} out = {result['total_tokens']:,} total",
+        f"💰 Cost: ${result['input_cost']:.6f} in + ${result['output_cost']:.6f} out = ${result['total_cost']:.6f} total",
+    ]
+    if result.get("ttft") is not None:
+        cached = " (cached run)" if result.get("cached") else ""
+        lines.append(f"⏱️  First token: {result['ttft']:.2f}s / total {result['latency']:.2f}s{cached}")
+    lines.append(f"\n📄 Output ({result['content_path']}):\n{Path(result['content_path']).read_text()}")
+    print("\n".join(lines))
 
 
 def compare_costs(results: list):
-    """Compare costs across models."""
-    print("\n" + "="*60)
-    print("COST COMPARISON")
-    print("="*60)
-
-    print("\nPer Email Generation:")
-    for r in results:
-        print(f"  {r['model']:15} ${r['total_cost']:.6f}")
-
-    print("\nEstimated Weekly Cost (1 email):")
-    for r in results:
-        print(f"  {r['model']:15} ${r['total_cost']:.6f}")
-
-    print("\nEstimated Monthly Cost (4 emails):")
+    """Compare costs across models in one table (per email = per week, 1 email/week)."""
+    baseline = next((r['total_cost'] for r in results if r['model'] == 'gpt-4.1'), None)
+
+    lines = [
+        "\n" + "="*60,
+        "COST COMPARISON",
+        "="*60,
+        f"\n  {'Model':15} {'Per email/week':>14} {'Month (4)':>11} {'Year (52)':>10}  Savings vs GPT-4.1 (per year)",
+    ]
     for r in results:
-        monthly = r['total_cost'] * 4
-        print(f"  {r['model']:15} ${monthly:.6f}")
+        cost = r['total_cost']
+        line = f"  {r['model']:15} {f'${cost:.6f}':>14} {f'${cost * 4:.6f}':>11} {f'${cost * 52:.4f}':>10}"
+        if baseline and r['model'] != 'gpt-4.1':
+            savings = (baseline - cost) * 52
+            sign = "💰 SAVE" if savings > 0 else "💸 COST"
+            line += f"  {sign} ${abs(savings):.4f} ({(baseline - cost) / baseline * 100:+.1f}%)"
+        lines.append(line)
+    print("\n".join(lines))
 
-    print("\nEstimated Yearly Cost (52 emails):")
-    for r in results:
-        yearly = r['total_cost'] * 52
-        print(f"  {r['model']:15} ${yearly:.4f}")
 
-    # Show savings
-    baseline = next(r for r in results if r['model'] == 'gpt-4.1')
-    print("\nSavings vs GPT-4.1 (per year):")
-    for r in results:
-        if r['model'] != 'gpt-4.1':
-            savings = (baseline['total_cost'] - r['total_cost']) * 52
-            pct = ((baseline['total_cost'] - r['total_cost']) / baseline['total_cost']) * 100
-            sign = "💰 SAVE" if savings > 0 else "💸 COST"
-            print(f"  {r['model']:15} {sign} ${abs(savings):.4f} ({pct:+.1f}%)")
+async def run_all(prompt: str) -> list:
+    """Run every model test concurrently; failures come back as exceptions."""
+    try:
+        return await asyncio.gather(
+            test_gpt4_chat(prompt),
+            test_gpt5_responses("gpt-5-mini", prompt),
+            test_gpt5_responses("gpt-5.1", prompt),
+            return_exceptions=True,
+        )
+    finally:
+        await client.close()
 
 
 if __name__ == "__main__":
     results = []
 
-    # Test GPT-4.1
-    try:
-        result = test_gpt4_chat(SAMPLE_PROMPT)
-        print_results(result)
-        results.append(result)
-    except Exception as e:
-        print(f"❌ GPT-4.1 failed: {e}")
-
-    # Test GPT-5-mini
-    try:
-        result = test_gpt5_responses("gpt-5-mini", SAMPLE_PROMPT)
-        print_results(result)
-        results.append(result)
-    except Exception as e:
-        print(f"❌ GPT-5-mini failed: {e}")
-
-    # Test GPT-5.1
-    try:
-        result = test_gpt5_responses("gpt-5.1", SAMPLE_PROMPT)
+    # Test GPT-4.1, GPT-5-mini and GPT-5.1 at once; print after all finish so output doesn't interleave
+    labels = ["GPT-4.1", "GPT-5-mini", "GPT-5.1"]
+    for label, result in zip(labels, asyncio.run(run_all(SAMPLE_PROMPT))):
+        if isinstance(result, Exception):
+            print(f"❌ {label} failed: {result}")
+            continue
         print_results(result)
         results.append(result)
-    except Exception as e:
-        print(f"❌ GPT-5.1 failed: {e}")
 
     # Compare
     if len(results) >= 2:
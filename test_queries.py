@@ -1,92 +1,95 @@
 """Test script to debug the BigQuery data structure."""
-import json
 from google.cloud import bigquery
 from app.config import config
 
-client = bigquery.Client(project=config.BQ_PROJECT_ID)
+# Repeat debug runs are served from BigQuery's 24h result cache
+client = bigquery.Client(
+    project=config.BQ_PROJECT_ID,
+    default_query_job_config=bigquery.QueryJobConfig(use_query_cache=True),
+)
 table_id = config.get_full_table_id()
 
-# Test 1: Check actual structure of JSON fields
+# Test 1: Check actual structure of JSON fields (keys are read in SQL so only they are transferred)
 query1 = f"""
 SELECT
     meeting_id,
     JSON_VALUE(client_info, '$.client') as extracted_client,
-    client_info as raw_client_info,
+    SUBSTR(TO_JSON_STRING(client_info), 1, 100) as raw_client_info,
     JSON_VALUE(now, '$.qualified') as now_qualified,
     JSON_VALUE(fit, '$.qualified') as fit_qualified,
-    now as raw_now,
-    fit as raw_fit
+    JSON_KEYS(now, 1) as now_keys,
+    JSON_KEYS(fit, 1) as fit_keys,
+    TO_JSON_STRING(JSON_QUERY(fit, '$.services')) as fit_services
 FROM `{table_id}`
-WHERE DATE(scored_at) = '2025-10-03'
+WHERE scored_at >= TIMESTAMP('2025-10-03') AND scored_at < TIMESTAMP('2025-10-04')
 LIMIT 5
 """
 
+# Tests 2 and 3: criteria counts and top clients in one job. BigQuery doesn't materialize
+# non-recursive CTEs, so `base` is still scanned once per reference; only the round-trip is saved
+query2 = f"""
+WITH base AS (
+    SELECT qualified, now, next, measure, blocker, fit, client_info
+    FROM `{table_id}`
+    WHERE scored_at >= TIMESTAMP('2025-10-01') AND scored_at < TIMESTAMP('2025-12-01')
+),
+counts AS (
+    SELECT
+        COUNT(*) as total,
+        COUNTIF(qualified = TRUE) as qualified,
+        COUNTIF(JSON_VALUE(now, '$.qualified') = 'true') as now_true,
+        COUNTIF(JSON_VALUE(next, '$.qualified') = 'true') as next_true,
+        COUNTIF(JSON_VALUE(measure, '$.qualified') = 'true') as measure_true,
+        COUNTIF(JSON_VALUE(blocker, '$.qualified') = 'true') as blocker_true,
+        COUNTIF(JSON_VALUE(fit, '$.qualified') = 'true') as fit_true
+    FROM base
+),
+top_clients AS (
+    SELECT ARRAY_AGG(STRUCT(client, count) ORDER BY count DESC LIMIT 10) as clients
+    FROM (
+        SELECT JSON_VALUE(client_info, '$.client') as client, COUNT(*) as count
+        FROM base
+        WHERE client_info IS NOT NULL
+        GROUP BY client
+    )
+)
+SELECT * FROM counts CROSS JOIN top_clients
+"""
+
+# Dry run to confirm the scored_at range prunes the scan (bare ranges, not DATE(scored_at))
+for name, sql in (("Test 1", query1), ("Tests 2+3", query2)):
+    dry = client.query(sql, job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False))
+    print(f"{name} would scan {dry.total_bytes_processed / 1e6:,.1f} MB")
+
+# Submit both jobs up front so BigQuery runs them concurrently, then read results in order
+job1 = client.query(query1)
+job2 = client.query(query2)
+
 print("Testing JSON field structure...")
-result1 = client.query(query1).result()
+result1 = job1.result()
 for row in result1:
     print(f"\nMeeting: {row.meeting_id}")
     print(f"  Client extracted: {row.extracted_client}")
-    print(f"  Client raw: {str(row.raw_client_info)[:100] if row.raw_client_info else 'None'}")
+    print(f"  Client raw: {row.raw_client_info or 'None'}")
     print(f"  NOW qualified: {row.now_qualified}")
     print(f"  FIT qualified: {row.fit_qualified}")
-
-    # Parse and inspect NOW structure
-    if row.raw_now:
-        try:
-            now_obj = json.loads(row.raw_now)
-            print(f"  NOW keys: {list(now_obj.keys())}")
-        except:
-            print(f"  NOW parse failed")
-
-    # Parse and inspect FIT structure
-    if row.raw_fit:
-        try:
-            fit_obj = json.loads(row.raw_fit)
-            print(f"  FIT keys: {list(fit_obj.keys())}")
-            if 'services' in fit_obj:
-                print(f"  FIT services: {fit_obj['services']}")
-        except:
-            print(f"  FIT parse failed")
-
-# Test 2: Count qualified meetings by criteria
-query2 = f"""
-SELECT
-    COUNT(*) as total,
-    COUNTIF(qualified = TRUE) as qualified,
-    COUNTIF(JSON_VALUE(now, '$.qualified') = 'true') as now_true,
-    COUNTIF(JSON_VALUE(next, '$.qualified') = 'true') as next_true,
-    COUNTIF(JSON_VALUE(measure, '$.qualified') = 'true') as measure_true,
-    COUNTIF(JSON_VALUE(blocker, '$.qualified') = 'true') as blocker_true,
-    COUNTIF(JSON_VALUE(fit, '$.qualified') = 'true') as fit_true
-FROM `{table_id}`
-WHERE DATE(scored_at) BETWEEN '2025-10-01' AND '2025-11-30'
-"""
+    if row.now_keys:
+        print(f"  NOW keys: {row.now_keys}")
+    if row.fit_keys:
+        print(f"  FIT keys: {row.fit_keys}")
+    if row.fit_services and row.fit_services != "null":
+        print(f"  FIT services: {row.fit_services}")
 
 print("\n\nCriteria qualification counts:")
-result2 = client.query(query2).result()
-for row in result2:
-    print(f"Total meetings: {row.total}")
-    print(f"Qualified: {row.qualified}")
-    print(f"NOW qualified: {row.now_true}")
-    print(f"NEXT qualified: {row.next_true}")
-    print(f"MEASURE qualified: {row.measure_true}")
-    print(f"BLOCKER qualified: {row.blocker_true}")
-    print(f"FIT qualified: {row.fit_true}")
-
-# Test 3: Check client_info structure
-query3 = f"""
-SELECT DISTINCT
-    JSON_VALUE(client_info, '$.client') as client,
-    COUNT(*) as count
-FROM `{table_id}`
-WHERE DATE(scored_at) BETWEEN '2025-10-01' AND '2025-11-30'
-    AND client_info IS NOT NULL
-GROUP BY client
-ORDER BY count DESC
-LIMIT 10
-"""
+row = next(iter(job2.result()))
+print(f"Total meetings: {row.total}")
+print(f"Qualified: {row.qualified}")
+print(f"NOW qualified: {row.now_true}")
+print(f"NEXT qualified: {row.next_true}")
+print(f"MEASURE qualified: {row.measure_true}")
+print(f"BLOCKER qualified: {row.blocker_true}")
+print(f"FIT qualified: {row.fit_true}")
 
 print("\n\nTop clients:")
-result3 = client.query(query3).result()
-for row in result3:
-    print(f"  {row.client}: {row.count} meetings")
\ No newline at end of file
+for entry in row.clients or []:
+    print(f"  {entry['client']}: {entry['count']} meetings")